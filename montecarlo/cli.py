@@ -0,0 +1,189 @@
+import argparse
+import json
+import sys
+import time
+import numpy as np
+from montecarlo.montecarlo import Die, Game, StreamAnalyzer, Profiler, BIT_GENERATORS
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+def load_spec(path):
+    """
+    PURPOSE: Reads the JSON spec of a simulation and fills in its defaults. The spec holds "faces" (list), "weights" (one list shared by every die, or one list per die - defaults to equal weights), "num_dice" (int - defaults to the number of weight lists, or 1), "num_rolls" (int), and optionally "seed", "workers" (defaults to 1), "chunk_size" and "bit_generator" (defaults to "PCG64").
+
+    INPUT:
+    path    the path of the JSON spec, or "-" to read it from standard input (str)
+
+    OUTPUT:
+    the spec with its defaults filled in (dict)
+    """
+    if path == '-':
+        spec = json.load(sys.stdin)
+    else:
+        with open(path) as f:
+            spec = json.load(f)
+    if 'faces' not in spec or 'num_rolls' not in spec:
+        raise ValueError('The spec must give "faces" and "num_rolls"')
+    if not isinstance(spec['faces'], list) or not spec['faces']:
+        raise ValueError('The spec must give "faces" as a non-empty list')
+    weights = spec.get('weights')
+    if weights is not None and (not isinstance(weights, list) or not weights):
+        raise ValueError('The spec must give "weights" as a non-empty list')
+    per_die = weights is not None and isinstance(weights[0], list)
+    for die_weights in (weights if per_die else [weights] if weights is not None else []):
+        if not isinstance(die_weights, list) or len(die_weights) != len(spec['faces'])\
+        or not all(isinstance(w, (int, float)) and not isinstance(w, bool) for w in die_weights):
+            raise ValueError('Every list of weights must give one number per face')
+    spec.setdefault('num_dice', len(weights) if per_die else 1)
+    spec.setdefault('seed', None)
+    spec.setdefault('workers', 1)
+    spec.setdefault('chunk_size', None)
+    spec.setdefault('bit_generator', 'PCG64')
+    return spec
+
+def build_game(spec):
+    """
+    PURPOSE: Makes the game described by a spec. Dice that share weights are the same Die object, so their sampling tables are built once.
+
+    INPUT:
+    spec    the simulation spec (dict)
+
+    OUTPUT:
+    a Game object
+    """
+    faces = np.array(spec['faces'])
+    weights = spec.get('weights')
+    if weights is None or not isinstance(weights[0], list):
+        weights = [weights] * spec['num_dice']
+    if len(weights) != spec['num_dice']:
+        raise ValueError('The spec must give one list of weights per die, or one list for all dice')
+    dice = {}
+    for die_weights in weights:
+        key = None if die_weights is None else tuple(die_weights)
+        if key not in dice:
+            dice[key] = Die(faces)
+            if die_weights is not None:
+                dice[key].change_weights(np.asarray(die_weights, dtype = float))
+    return Game([dice[None if w is None else tuple(w)] for w in weights])
+
+def peak_memory(children = False):
+    """
+    PURPOSE: Gives the peak resident memory of the process so far, or of its largest finished child process (such as a worker of a process pool), where the platform reports it.
+
+    INPUT:
+    children    optional flag to report the child processes instead of this one - defaults to False (bool)
+
+    OUTPUT:
+    the peak resident memory in bytes (int), or None
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def run(spec, save = None, top = 10):
+    """
+    PURPOSE: Runs the simulation described by a spec and sums it up. With a chunk size and nothing to save, the game is rolled and analyzed chunk by chunk with Game.analyze_chunks (on spec["workers"] processes) so that memory stays bounded; otherwise it is played in full (on spec["workers"] processes) and can be saved with Game.save. The time of the save is reported apart from the time of the run.
+
+    INPUT:
+    spec    the simulation spec (dict)
+    save    optional directory to save the binary results to (str)
+    top     the number of most common combinations to report - defaults to 10 (int)
+
+    OUTPUT:
+    the statistics of the run (dict)
+    """
+    game = build_game(spec)
+    num_rolls, chunk_size = spec['num_rolls'], spec['chunk_size']
+
+    with Profiler() as profiler:
+        start = time.perf_counter()
+        if chunk_size and not save:
+            stream = game.analyze_chunks(num_rolls, chunk_size, spec['workers'], spec['seed'],\
+                                         bit_generator = spec['bit_generator'])
+        else:
+            stream = StreamAnalyzer(game.faces)
+            game.play(num_rolls, workers = spec['workers'], seed = spec['seed'],\
+                      bit_generator = spec['bit_generator'])
+            step = chunk_size or max(num_rolls, 1)
+            for begin in range(0, num_rolls, step):
+                stream.update(game.codes[begin:begin + step])
+        elapsed = time.perf_counter() - start
+        if save:
+            game.save(save)
+        save_elapsed = time.perf_counter() - start - elapsed
+
+    stream.comp_combo()
+    combos = stream.combo_df.head(top)
+    return {'num_rolls': num_rolls,
+            'num_dice': len(game.die_lst),
+            'seed': spec['seed'],
+            'jackpots': stream.comp_jackpot(),
+            'jackpot_prob': stream.comp_jackpot() / num_rolls if num_rolls else 0.0,
+            'distinct_combos': len(stream.combo_df),
+            'top_combos': [{'combo': [np.asarray(face).item() for face in combo], 'n': int(n)}
+                           for combo, n in zip(combos.index, combos['n'])],
+            'face_totals': dict(zip([str(face) for face in stream.faces.tolist()],\
+                                    stream.face_counts.tolist())),
+            'seconds': elapsed,
+            'rolls_per_sec': num_rolls / elapsed if elapsed > 0 else 0.0,
+            'die_rolls_per_sec': num_rolls * len(game.die_lst) / elapsed if elapsed > 0 else 0.0,
+            'save_seconds': save_elapsed if save else None,
+            'peak_memory': peak_memory(),
+            'peak_memory_workers': peak_memory(children = True),
+            'phases': {name: phase._asdict() for name, phase in profiler.stats.items()}}
+
+def main(argv = None):
+    """
+    PURPOSE: Runs a simulation from the command line: reads a JSON spec, runs it, writes its statistics as JSON and, optionally, its binary results, and prints the throughput and peak memory of the run.
+
+    INPUT:
+    argv    optional list of command-line arguments - defaults to sys.argv[1:] (list of str)
+
+    OUTPUT:
+    the exit status (int)
+    """
+    parser = argparse.ArgumentParser(prog = 'montecarlo', description = 'Run a Monte Carlo dice simulation from a JSON spec.')
+    parser.add_argument('spec', help = 'path of the JSON spec, or - to read it from standard input')
+    parser.add_argument('-o', '--output', help = 'write the statistics to this JSON file instead of standard output')
+    parser.add_argument('--save', help = 'save the binary results of the play to this directory (see Game.save)')
+    parser.add_argument('--num-rolls', type = int, help = 'override the number of rolls of the spec')
+    parser.add_argument('--seed', type = int, help = 'override the seed of the spec')
+    parser.add_argument('--workers', type = int, help = 'override the number of workers of the spec')
+    parser.add_argument('--chunk-size', type = int, help = 'override the chunk size of the spec')
+    parser.add_argument('--bit-generator', choices = BIT_GENERATORS, help = 'override the bit generator of the spec')
+    parser.add_argument('--top', type = int, default = 10, help = 'number of most common combinations to report')
+    args = parser.parse_args(argv)
+
+    try:
+        spec = load_spec(args.spec)
+        for key in ('num_rolls', 'seed', 'workers', 'chunk_size', 'bit_generator'):
+            if getattr(args, key) is not None:
+                spec[key] = getattr(args, key)
+        stats = run(spec, args.save, args.top)
+    except (OSError, ValueError, KeyError, TypeError) as error:
+        parser.exit(2, 'montecarlo: error: %s\n' % error)
+
+    report = '%d rolls of %d dice in %.3f s: %.0f rolls/s' % (stats['num_rolls'], stats['num_dice'],\
+                                                              stats['seconds'], stats['rolls_per_sec'])
+    if stats['peak_memory'] is not None:
+        report += ', peak memory %.1f MiB' % (stats['peak_memory'] / 2 ** 20)
+    if stats['peak_memory_workers']:
+        report += ' (%.1f MiB in a worker)' % (stats['peak_memory_workers'] / 2 ** 20)
+    if stats['save_seconds'] is not None:
+        report += ', saved in %.3f s' % stats['save_seconds']
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(stats, f, indent = 1)
+        print(report)
+    else:
+        json.dump(stats, sys.stdout, indent = 1)
+        print()
+        print(report, file = sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
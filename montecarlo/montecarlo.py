@@ -1,267 +1,2223 @@
+from collections import namedtuple
+from contextlib import contextmanager, nullcontext
+from statistics import NormalDist
+import functools
+import json
+import math
+import os
+import sys
+import threading
+import time
+import tracemalloc
 import numpy as np
-import pandas as pd
+
+# Smallest die and batch for which the alias table beats the inverse-CDF
+# binary search (see montecarlo_benchmarks.py).
+ALIAS_MIN_FACES = 16
+ALIAS_MIN_ROLLS = 256
+
+# Result of Game.play_until: the estimated rate, its confidence interval and
+# the number of rolls it took.
+Estimate = namedtuple('Estimate', ['estimate', 'low', 'high', 'num_rolls'])
+
+# Results of Game.play with results="histogram": how many times each face
+# came up in each roll, stored sparsely (CSR-style) - roll r shows face code
+# indices[i] data[i] times for indptr[r] <= i < indptr[r + 1], with the codes
+# of a roll in ascending order - and die_totals[j, f], the number of times
+# die j landed on face code f.
+FaceHistogram = namedtuple('FaceHistogram', ['indptr', 'indices', 'data', 'die_totals'])
+
+# Number of games whose analyzers analyzer_for keeps, least recently used
+# first out.
+ANALYZER_CACHE_SIZE = 32
+
+# Bit generators that make_rng accepts by name.
+BIT_GENERATORS = ('PCG64', 'PCG64DXSM', 'Philox', 'SFC64', 'MT19937')
+
+# Totals of one phase recorded by a Profiler: how many times it ran, its wall
+# time, the number of single-die rolls it handled, the bytes it allocated
+# (0 unless memory is traced) and its throughput.
+PhaseStats = namedtuple('PhaseStats', ['calls', 'seconds', 'rolls', 'bytes', 'rolls_per_sec'])
+
+# The Profiler that is recording, if any (see _phase).
+_PROFILER = None
+_NO_PHASE = nullcontext()
+
+class Profiler:
+    """
+    PURPOSE: This class records where the time of a simulation goes. While it is active (inside a with block), every phase of the work - "sample" (drawing face codes), "assemble" (putting the codes of the dice together into the results matrix), "reshape" (building dataframes out of the codes or codes out of dataframes) and "analyze" (computing statistics) - adds its wall time, number of single-die rolls and, optionally, allocated bytes to the totals. Phases run by other threads while it is active are recorded too: each thread nests its own phases, and the totals are added under a lock. When no profiler is active the phases cost one function call each.
+    
+    INPUT:
+    callback       optional function called as callback(phase, seconds, rolls, bytes) at the end of every phase
+    trace_memory   optional flag to measure the peak bytes allocated in each phase with tracemalloc, which slows the work down - defaults to False (bool)
+    
+    OUTPUT:
+    depends on method applied
+    """
+    def __init__(self, callback = None, trace_memory = False):
+        """
+        PURPOSE: Initializes a profiler with no phases recorded.
+        
+        INPUT:
+        callback       optional function called as callback(phase, seconds, rolls, bytes) at the end of every phase
+        trace_memory   optional flag to measure allocated bytes with tracemalloc - defaults to False (bool)
+        
+        OUTPUT:
+        none
+        """
+        self.callback = callback
+        self.trace_memory = trace_memory
+        self.__totals = {}
+        self.__lock = threading.Lock()
+        self.__running = threading.local()
+        self.__previous = None
+        self.__started_tracing = False
+    
+    def __enter__(self):
+        """
+        PURPOSE: Makes this profiler the active one, starting tracemalloc if memory is traced.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        the profiler
+        """
+        global _PROFILER
+        self.__previous = _PROFILER
+        _PROFILER = self
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.__started_tracing = True
+        return self
+    
+    def __exit__(self, *exc_info):
+        """
+        PURPOSE: Restores the profiler that was active before this one, stopping tracemalloc if this profiler started it.
+        
+        INPUT:
+        exc_info   the exception raised in the with block, if any
+        
+        OUTPUT:
+        False, so that exceptions are not swallowed
+        """
+        global _PROFILER
+        _PROFILER = self.__previous
+        if self.__started_tracing:
+            tracemalloc.stop()
+            self.__started_tracing = False
+        return False
+    
+    @contextmanager
+    def phase(self, name, rolls = 0):
+        """
+        PURPOSE: Records one run of a phase. A phase that starts while another is running in the same thread is counted as part of the outer one; phases of separate threads are each recorded. The allocated bytes come from tracemalloc, which measures the whole process, so phases that overlap in time share them.
+        
+        INPUT:
+        name    the name of the phase (str)
+        rolls   the number of single-die rolls the phase handles - defaults to 0 (int)
+        
+        OUTPUT:
+        a context manager around the work of the phase
+        """
+        if getattr(self.__running, 'active', False):
+            yield
+            return
+        self.__running.active = True
+        if self.trace_memory:
+            base = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            allocated = tracemalloc.get_traced_memory()[1] - base if self.trace_memory else 0
+            self.__running.active = False
+            with self.__lock:
+                totals = self.__totals.setdefault(name, [0, 0.0, 0, 0])
+                totals[0] += 1
+                totals[1] += seconds
+                totals[2] += rolls
+                totals[3] += allocated
+            if self.callback is not None:
+                self.callback(name, seconds, rolls, allocated)
+    
+    @property
+    def stats(self):
+        """
+        PURPOSE: Gives the totals of every phase recorded so far.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        a dict from phase name to PhaseStats
+        """
+        with self.__lock:
+            totals = [(name, list(phase)) for name, phase in self.__totals.items()]
+        return {name: PhaseStats(calls, seconds, rolls, allocated, rolls / seconds if seconds > 0 else 0.0)
+                for name, (calls, seconds, rolls, allocated) in totals}
+    
+    def reset(self):
+        """
+        PURPOSE: Forgets every phase recorded so far.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        none
+        """
+        with self.__lock:
+            self.__totals = {}
+
+def _phase(name, rolls = 0):
+    """
+    PURPOSE: Marks a phase of the work for the active Profiler, or does nothing when none is active.
+    
+    INPUT:
+    name    the name of the phase: "sample", "assemble", "reshape" or "analyze" (str)
+    rolls   the number of single-die rolls the phase handles - defaults to 0 (int)
+    
+    OUTPUT:
+    a context manager around the work of the phase
+    """
+    if _PROFILER is None:
+        return _NO_PHASE
+    return _PROFILER.phase(name, rolls)
+
+def _pandas():
+    """
+    PURPOSE: Imports pandas the first time a dataframe is needed, so that rolling dice and analyzing arrays of face codes do not pay for loading pandas.
+    
+    INPUT:
+    none
+    
+    OUTPUT:
+    the pandas module
+    """
+    import pandas
+    return pandas
+
+def make_rng(seed = None, bit_generator = 'PCG64'):
+    """
+    PURPOSE: Builds the numpy Generator that rolls are drawn from, so that runs can be reproduced from a seed and the bit generator can be chosen for speed.
+    
+    INPUT:
+    seed            optional int, SeedSequence or Generator - a Generator is returned as it is, anything else seeds a new one (defaults to None for fresh entropy)
+    bit_generator   name of the numpy bit generator, one of BIT_GENERATORS - defaults to "PCG64" (str)
+    
+    OUTPUT:
+    a numpy Generator
+    """
+    if isinstance(seed, np.random.Generator):
+        return seed
+    if bit_generator not in BIT_GENERATORS:
+        raise ValueError('The bit generator must be one of ' + ', '.join(BIT_GENERATORS))
+    return np.random.Generator(getattr(np.random, bit_generator)(seed))
+
+def _seed_sequence(seed):
+    """
+    PURPOSE: Turns the seed of a game into a SeedSequence that can be split between workers. A Generator is asked for fresh seed material, so that it is advanced like any other draw.
+    
+    INPUT:
+    seed    an int, SeedSequence, Generator or None
+    
+    OUTPUT:
+    a numpy SeedSequence
+    """
+    if isinstance(seed, np.random.SeedSequence):
+        return seed
+    if isinstance(seed, np.random.Generator):
+        return np.random.SeedSequence(seed.integers(2 ** 63, size = 4).tolist())
+    return np.random.SeedSequence(seed)
+
+def _pick_strategy(num_faces, num_rolls):
+    """
+    PURPOSE: Chooses the sampling strategy for the "auto" setting. The alias table costs O(k) to build but O(1) per draw, so it is only used once the die has enough faces and the batch is large enough to pay the build back.
+    
+    INPUT:
+    num_faces   the number of faces on the die (int)
+    num_rolls   the number of rolls in the batch (int)
+    
+    OUTPUT:
+    either "cdf" or "alias" (str)
+    """
+    if num_faces >= ALIAS_MIN_FACES and num_rolls >= max(ALIAS_MIN_ROLLS, num_faces):
+        return 'alias'
+    return 'cdf'
+
+def _code_dtype(num_faces):
+    """
+    PURPOSE: Picks the smallest unsigned integer type that can hold a code for every face of a die.
+    
+    INPUT:
+    num_faces   the number of faces on the die (int)
+    
+    OUTPUT:
+    a numpy dtype (uint8, uint16 or uint32)
+    """
+    if num_faces <= 2 ** 8:
+        return np.dtype(np.uint8)
+    elif num_faces <= 2 ** 16:
+        return np.dtype(np.uint16)
+    return np.dtype(np.uint32)
+
+def _pack_rows(codes, num_faces):
+    """
+    PURPOSE: Packs each row of a matrix of face codes into a single key so rows can be counted in one pass. Rows are read as mixed-radix numbers over the face count and packed into int64; when num_faces ** columns would overflow 64 bits, each row's bytes are used as the key instead.
+    
+    INPUT:
+    codes       matrix of face codes, one row per roll (array)
+    num_faces   the number of faces the codes refer to (int)
+    
+    OUTPUT:
+    keys    a 1-D array with one key per row, equal exactly when the rows are equal
+    """
+    codes = np.asarray(codes)
+    if max(num_faces, 1) ** codes.shape[1] <= np.iinfo(np.int64).max:
+        keys = np.zeros(len(codes), dtype = np.int64)
+        for j in range(codes.shape[1]):
+            keys *= num_faces
+            keys += codes[:, j]
+        return keys
+    rows = np.ascontiguousarray(codes)
+    return rows.view(np.dtype((np.void, rows.dtype.itemsize * rows.shape[1]))).ravel()
+
+def _combo_keys(codes, num_faces):
+    """
+    PURPOSE: Gives each row of a matrix of face codes a key that only depends on which faces it holds, not their order. The key is the sum over the dice of (dice + 1) ** code, whose base-(dice + 1) digits are the number of times each face was rolled, so two rows share a key exactly when they hold the same combination.
+    
+    INPUT:
+    codes       matrix of face codes, one row per roll (array)
+    num_faces   the number of faces the codes refer to (int)
+    
+    OUTPUT:
+    keys    an int64 array with one key per row, or None when the keys would overflow 64 bits
+    """
+    base = codes.shape[1] + 1
+    if num_faces * math.log2(base) >= 62:
+        return None
+    powers = base ** np.arange(num_faces, dtype = np.int64)
+    keys = np.zeros(len(codes), dtype = np.int64)
+    for j in range(codes.shape[1]):
+        keys += powers[codes[:, j]]
+    return keys
+
+def _count_keys(keys, num_keys = None, weights = None):
+    """
+    PURPOSE: Counts the distinct values of an array of keys. When there are no more possible keys than keys (or 2 ** 16), they are counted in one pass with bincount; otherwise with np.unique.
+    
+    INPUT:
+    keys       the keys (array)
+    num_keys   optional number of possible int keys, which are then 0 to num_keys - 1 (int)
+    weights    optional weight of each key, summed per distinct key (array)
+    
+    OUTPUT:
+    uniq     the distinct keys in ascending order (array)
+    counts   the number of times each distinct key occurred (array)
+    sums     the summed weights of each distinct key, or None without weights (array)
+    """
+    sums = None
+    if num_keys is not None and num_keys <= max(len(keys), 2 ** 16):
+        counts = np.bincount(keys, minlength = num_keys)
+        uniq = np.flatnonzero(counts)
+        counts = counts[uniq]
+        if weights is not None:
+            sums = np.bincount(keys, weights = weights, minlength = num_keys)[uniq]
+    elif weights is None:
+        uniq, counts = np.unique(keys, return_counts = True)
+    else:
+        uniq, inverse, counts = np.unique(keys, return_inverse = True, return_counts = True)
+        sums = np.bincount(inverse.ravel(), weights = weights, minlength = len(uniq))
+    return uniq, counts, sums
+
+def _by_count(rows, counts, sums, lexical = True):
+    """
+    PURPOSE: Orders counted rows by descending count, breaking ties by the rows themselves in ascending order.
+    
+    INPUT:
+    rows      the distinct rows (array)
+    counts    the count of each row (array)
+    sums      the summed weights of each row, or None (array)
+    lexical   whether the rows still need sorting among ties - pass False when they are already in ascending order (bool)
+    
+    OUTPUT:
+    rows, counts and, when sums are given, sums, all in the new order
+    """
+    if lexical:
+        order = np.lexsort(tuple(rows[:, j] for j in reversed(range(rows.shape[1]))) + (-counts,))
+    else:
+        order = np.argsort(-counts, kind = 'stable')
+    if sums is not None:
+        return rows[order], counts[order], sums[order]
+    return rows[order], counts[order]
+
+def _count_rows(codes, num_faces, weights = None):
+    """
+    PURPOSE: Counts the distinct rows of a matrix of face codes using packed row keys, and unpacks the distinct keys back into rows.
+    
+    INPUT:
+    codes       matrix of face codes, one row per roll (array)
+    num_faces   the number of faces the codes refer to (int)
+    weights     optional weight of each row, summed per distinct row (array)
+    
+    OUTPUT:
+    rows     one copy of each distinct row, ordered by descending count (array)
+    counts   the number of times each distinct row occurred (array)
+    sums     the summed weights of each distinct row - only returned when weights are given (array)
+    """
+    codes = np.asarray(codes)
+    num_dice = codes.shape[1]
+    keys = _pack_rows(codes, num_faces)
+    if keys.dtype == np.int64:
+        uniq, counts, sums = _count_keys(keys, max(num_faces, 1) ** num_dice, weights)
+        rows = np.column_stack(np.unravel_index(uniq, (num_faces,) * num_dice))\
+        if num_dice > 0 else np.empty((len(uniq), 0), dtype = np.intp)
+        return _by_count(rows, counts, sums, lexical = False)
+    uniq, counts, sums = _count_keys(keys, weights = weights)
+    rows = np.frombuffer(uniq.tobytes(), dtype = codes.dtype).reshape(len(uniq), num_dice)
+    return _by_count(rows, counts, sums)
+
+def _count_combos(codes, num_faces, weights = None):
+    """
+    PURPOSE: Counts the distinct combinations (unordered rows) of a matrix of face codes. The rows are keyed by their face counts (see _combo_keys), which avoids sorting every row; when those keys would overflow, the rows are sorted and counted with _count_rows instead.
+    
+    INPUT:
+    codes       matrix of face codes, one row per roll (array)
+    num_faces   the number of faces the codes refer to (int)
+    weights     optional weight of each row, summed per distinct combination (array)
+    
+    OUTPUT:
+    rows     one sorted row per distinct combination, ordered by descending count (array)
+    counts   the number of times each combination occurred (array)
+    sums     the summed weights of each combination - only returned when weights are given (array)
+    """
+    codes = np.asarray(codes)
+    keys = _combo_keys(codes, num_faces)
+    if keys is None:
+        return _count_rows(np.sort(codes, axis = 1), num_faces, weights)
+    base = codes.shape[1] + 1
+    uniq, counts, sums = _count_keys(keys, base ** num_faces, weights)
+    face_counts = (uniq[:, None] // base ** np.arange(num_faces, dtype = np.int64)) % base
+    rows = np.repeat(np.tile(np.arange(num_faces), len(uniq)), face_counts.ravel())\
+    .reshape(len(uniq), codes.shape[1])
+    return _by_count(rows, counts, sums)
+
+def _jackpot_mask(codes):
+    """
+    PURPOSE: Marks the rows of a matrix of face codes in which every die shows the same face, comparing one column at a time.
+    
+    INPUT:
+    codes    matrix of face codes, one row per roll (array)
+    
+    OUTPUT:
+    a boolean array with one entry per row
+    """
+    mask = np.ones(len(codes), dtype = bool)
+    for j in range(1, codes.shape[1]):
+        mask &= codes[:, j] == codes[:, 0]
+    return mask
+
+def _histogram(codes, num_faces):
+    """
+    PURPOSE: Turns a matrix of face codes into the per-roll face histograms of a FaceHistogram. Each row is sorted, and every run of equal codes becomes one (face code, count) entry.
+    
+    INPUT:
+    codes       matrix of face codes, one row per roll (array)
+    num_faces   the number of faces the codes refer to (int)
+    
+    OUTPUT:
+    a FaceHistogram of the rows
+    """
+    num_rolls, num_dice = codes.shape
+    ordered = np.sort(codes, axis = 1)
+    starts = np.ones(ordered.shape, dtype = bool)
+    starts[:, 1:] = ordered[:, 1:] != ordered[:, :-1]
+    positions = np.flatnonzero(starts)
+    indptr = np.zeros(num_rolls + 1, dtype = np.int64)
+    np.cumsum(starts.sum(axis = 1), out = indptr[1:])
+    data = np.diff(np.append(positions, ordered.size)).astype(_code_dtype(num_dice + 1))
+    offsets = np.arange(num_dice, dtype = np.int64) * num_faces
+    die_totals = np.bincount((codes + offsets).ravel(), minlength = num_dice * num_faces)\
+    .reshape(num_dice, num_faces)
+    return FaceHistogram(indptr, ordered.ravel()[positions], data, die_totals)
+
+def _join_histograms(parts, num_dice, num_faces):
+    """
+    PURPOSE: Joins the FaceHistograms of consecutive blocks of rolls into one.
+    
+    INPUT:
+    parts       the histograms of the blocks, in order (list)
+    num_dice    the number of dice in the game (int)
+    num_faces   the number of faces the codes refer to (int)
+    
+    OUTPUT:
+    a FaceHistogram of all the rolls
+    """
+    if len(parts) == 1:
+        return parts[0]
+    offsets = np.cumsum([0] + [len(part.indices) for part in parts[:-1]])
+    indptr = np.concatenate([np.zeros(1, dtype = np.int64)] +\
+                            [part.indptr[1:] + offset for part, offset in zip(parts, offsets)])
+    die_totals = np.zeros((num_dice, num_faces), dtype = np.int64)
+    for part in parts:
+        die_totals += part.die_totals
+    return FaceHistogram(indptr, np.concatenate([part.indices for part in parts]),\
+                         np.concatenate([part.data for part in parts]), die_totals)
+
+def _roll_histogram(groups, num_dice, num_faces, num_rolls, rng = None, chunk_size = 2 ** 16):
+    """
+    PURPOSE: Rolls a game's dice chunk by chunk and keeps only the face histograms of the rolls, so the full matrix of face codes never has to be held in memory.
+    
+    INPUT:
+    groups       the [die, remap, columns] groups of a game's sampling plan (list)
+    num_dice     the number of dice in the game (int)
+    num_faces    the number of faces on each die (int)
+    num_rolls    the number of rolls (int)
+    rng          optional numpy Generator to draw from - defaults to each die's own generator
+    chunk_size   optional number of rolls per chunk - defaults to 2 ** 16 (int)
+    
+    OUTPUT:
+    a FaceHistogram of the rolls
+    """
+    parts = []
+    for start in range(0, num_rolls, chunk_size):
+        codes = _roll_codes(groups, num_dice, num_faces, min(chunk_size, num_rolls - start), rng)
+        with _phase('assemble', codes.size):
+            parts.append(_histogram(codes, num_faces))
+    if not parts:
+        parts.append(_histogram(np.empty((0, num_dice), dtype = _code_dtype(num_faces)), num_faces))
+    return _join_histograms(parts, num_dice, num_faces)
+
+def _count_histogram_combos(histogram, num_faces, chunk_size = 2 ** 16):
+    """
+    PURPOSE: Counts the distinct combinations of faces straight from the face histograms of a game. When the combination keys of _combo_keys fit in 64 bits they are summed from the histogram entries; otherwise the sorted rolls are rebuilt from the histograms one chunk at a time (np.repeat of the face codes by their counts gives each roll already sorted) and counted.
+    
+    INPUT:
+    histogram    the FaceHistogram of the rolls
+    num_faces    the number of faces the codes refer to (int)
+    chunk_size   optional number of rolls rebuilt at a time when the keys would overflow - defaults to 2 ** 16 (int)
+    
+    OUTPUT:
+    rows     one sorted row per distinct combination, ordered by descending count (array)
+    counts   the number of times each combination occurred (array)
+    """
+    indptr, indices, data, die_totals = histogram
+    num_rolls, num_dice = len(indptr) - 1, len(die_totals)
+    base = num_dice + 1
+    if num_rolls == 0:
+        return np.empty((0, num_dice), dtype = np.intp), np.empty(0, dtype = np.int64)
+    if num_faces * math.log2(base) < 62:
+        powers = base ** np.arange(num_faces, dtype = np.int64)
+        keys = np.add.reduceat(data * powers[indices], indptr[:-1])
+        uniq, counts, sums = _count_keys(keys, base ** num_faces)
+        face_counts = (uniq[:, None] // powers) % base
+        rows = np.repeat(np.tile(np.arange(num_faces), len(uniq)), face_counts.ravel())\
+        .reshape(len(uniq), num_dice)
+        return _by_count(rows, counts, None)
+    rows, counts = [], []
+    for start in range(0, num_rolls, chunk_size):
+        stop = min(start + chunk_size, num_rolls)
+        span = slice(indptr[start], indptr[stop])
+        chunk_rows, chunk_counts = _count_rows(np.repeat(indices[span], data[span])\
+                                               .reshape(stop - start, num_dice), num_faces)
+        rows.append(chunk_rows)
+        counts.append(chunk_counts)
+    rows, counts = np.concatenate(rows), np.concatenate(counts)
+    if num_rolls > chunk_size:
+        rows, counts = _merge_rows(rows, counts, num_faces)
+    return _by_count(rows, counts, None)
+
+def _count_faces(codes, num_faces, chunk_size = 2 ** 16):
+    """
+    PURPOSE: Counts how many times each face appears in each row of a matrix of face codes, with one bincount per chunk of rows to keep the temporary arrays small.
+    
+    INPUT:
+    codes        matrix of face codes, one row per roll (array)
+    num_faces    the number of faces the codes refer to (int)
+    chunk_size   optional number of rows per bincount - defaults to 2 ** 16 (int)
+    
+    OUTPUT:
+    counts   matrix with one row per roll and one column per face (array)
+    """
+    num_rolls = len(codes)
+    counts = np.empty((num_rolls, num_faces), dtype = np.int64)
+    offsets = np.arange(min(chunk_size, num_rolls), dtype = np.int64)[:, None] * num_faces
+    for start in range(0, num_rolls, chunk_size):
+        block = codes[start:start + chunk_size]
+        flat = offsets[:len(block)] + block
+        counts[start:start + len(block)] = np.bincount(flat.ravel(), minlength = len(block) * num_faces)\
+        .reshape(len(block), num_faces)
+    return counts
+
+def _sort_faces(faces):
+    """
+    PURPOSE: Puts a face table into sorted order, when its faces can be compared, and gives the mapping from old codes to new codes.
+    
+    INPUT:
+    faces   the face table (array)
+    
+    OUTPUT:
+    faces   the sorted face table (array)
+    rank    array mapping each old code to its new code, or None when the table is already sorted or cannot be sorted
+    """
+    try:
+        order = np.argsort(faces, kind = 'stable')
+    except TypeError:
+        return faces, None
+    if np.all(order == np.arange(len(faces))):
+        return faces, None
+    rank = np.empty(len(faces), dtype = np.intp)
+    rank[order] = np.arange(len(faces))
+    return faces[order], rank
+
+def _merge_rows(rows, counts, num_faces):
+    """
+    PURPOSE: Adds up the counts of rows that appear more than once, which merges the partial row counts of several chunks of rolls.
+    
+    INPUT:
+    rows        matrix of face codes, possibly with repeated rows (array)
+    counts      the count that goes with each row (array)
+    num_faces   the number of faces the codes refer to (int)
+    
+    OUTPUT:
+    rows     one copy of each distinct row, ordered by descending count (array)
+    counts   the total count of each distinct row (array)
+    """
+    keys, first, inverse = np.unique(_pack_rows(rows, num_faces), return_index = True,\
+                                     return_inverse = True)
+    totals = np.zeros(len(keys), dtype = np.int64)
+    np.add.at(totals, inverse.ravel(), counts)
+    order = np.argsort(-totals, kind = 'stable')
+    return rows[first[order]], totals[order]
+
+def _roll_codes(groups, num_dice, num_faces, num_rolls, rng = None):
+    """
+    PURPOSE: Rolls a game's dice into a new matrix of face codes. Each group of dice that share weights is sampled in a single batch and written into its columns.
+    
+    INPUT:
+    groups      the [die, remap, columns] groups of a game's sampling plan (list)
+    num_dice    the number of dice in the game (int)
+    num_faces   the number of faces on each die (int)
+    num_rolls   the number of rolls (int)
+    rng         optional numpy Generator to draw from - defaults to each die's own generator
+    
+    OUTPUT:
+    codes    matrix of face codes with one row per roll and one column per die (array)
+    """
+    codes = np.empty((num_rolls, num_dice), dtype = _code_dtype(num_faces))
+    for die, remap, cols in groups:
+        with _phase('sample', num_rolls * len(cols)):
+            drawn = die._sample_codes(num_rolls * len(cols), rng).reshape(num_rolls, len(cols))
+        with _phase('assemble', num_rolls * len(cols)):
+            if remap is not None:
+                drawn = remap[drawn]
+            codes[:, cols] = drawn
+    return codes
+
+def _roll_reduced(probs, num_rolls, rng, sampling, proposal = None):
+    """
+    PURPOSE: Rolls a game with one of the variance-reduction sampling modes, drawing every die by inverse-CDF lookup of its own column of uniforms in the game's face order.
+    
+    "stratified" gives each die a Latin hypercube column, with exactly one uniform in each of num_rolls equal strata. "antithetic" pairs each roll in the first half with the roll made from one minus its uniforms. "importance" draws each die from the proposal weights and returns the likelihood ratio of each roll, i.e. the product over the dice of p(face) / q(face).
+    
+    INPUT:
+    probs       matrix of face probabilities, one row per die (array)
+    num_rolls   the number of rolls (int)
+    rng         numpy Generator to draw from
+    sampling    "stratified", "antithetic" or "importance" (str)
+    proposal    matrix of proposal probabilities, one row per die - only used by "importance" (array)
+    
+    OUTPUT:
+    codes     matrix of face codes with one row per roll and one column per die (array)
+    weights   the likelihood ratio of each roll, or None when every roll has weight 1 (array)
+    """
+    num_dice, num_faces = probs.shape
+    codes = np.empty((num_rolls, num_dice), dtype = _code_dtype(num_faces))
+    table = proposal if sampling == 'importance' else probs
+    log_weights = np.zeros(num_rolls) if sampling == 'importance' else None
+    for j in range(num_dice):
+        if sampling == 'stratified':
+            uniforms = (rng.permutation(num_rolls) + rng.random(num_rolls)) / num_rolls
+        elif sampling == 'antithetic':
+            half = rng.random((num_rolls + 1) // 2)
+            uniforms = np.concatenate([half, 1.0 - half])[:num_rolls]
+        else:
+            uniforms = rng.random(num_rolls)
+        cum = np.cumsum(table[j])
+        drawn = np.searchsorted(cum, uniforms * cum[-1], side = 'right')
+        codes[:, j] = np.minimum(drawn, np.searchsorted(cum, cum[-1]))
+        if log_weights is not None:
+            with np.errstate(divide = 'ignore', invalid = 'ignore'):
+                log_ratio = np.log(probs[j]) - np.log(proposal[j])
+            log_weights += log_ratio[codes[:, j]]
+    if log_weights is None:
+        return codes, None
+    return codes, np.exp(log_weights)
+
+def _play_block(groups, num_dice, num_faces, num_rolls, seed_seq, bit_generator = 'PCG64', histogram = False):
+    """
+    PURPOSE: Rolls one worker's block of a parallel game from its own child seed sequence. It lives at module level so that process pools can pickle it.
+    
+    INPUT:
+    groups          the [die, remap, columns] groups of a game's sampling plan (list)
+    num_dice        the number of dice in the game (int)
+    num_faces       the number of faces on each die (int)
+    num_rolls       the number of rolls in the block (int)
+    seed_seq        the worker's numpy SeedSequence
+    bit_generator   name of the numpy bit generator - defaults to "PCG64" (str)
+    histogram       optional flag to hand back only the face histograms of the block - defaults to False (bool)
+    
+    OUTPUT:
+    codes    matrix of face codes for the block (array), or its FaceHistogram
+    """
+    if histogram:
+        return _roll_histogram(groups, num_dice, num_faces, num_rolls, make_rng(seed_seq, bit_generator))
+    return _roll_codes(groups, num_dice, num_faces, num_rolls, make_rng(seed_seq, bit_generator))
+
+def _stream_block(groups, num_dice, faces, num_rolls, seed_seq, bit_generator = 'PCG64'):
+    """
+    PURPOSE: Rolls one chunk of a game and analyzes it with a StreamAnalyzer of its own, so that a worker hands back small running statistics instead of the rolls. It lives at module level so that process pools can pickle it.
+    
+    INPUT:
+    groups          the [die, remap, columns] groups of a game's sampling plan (list)
+    num_dice        the number of dice in the game (int)
+    faces           the face table of the game (array)
+    num_rolls       the number of rolls in the chunk (int)
+    seed_seq        the chunk's numpy SeedSequence
+    bit_generator   name of the numpy bit generator - defaults to "PCG64" (str)
+    
+    OUTPUT:
+    a StreamAnalyzer over the rolls of the chunk
+    """
+    stream = StreamAnalyzer(faces)
+    stream.update(_roll_codes(groups, num_dice, len(faces), num_rolls, make_rng(seed_seq, bit_generator)))
+    return stream
+
+@functools.lru_cache(maxsize = 128)
+def _exact_combos(probs_bytes, num_dice, num_faces):
+    """
+    PURPOSE: Computes the exact probability of every combination of faces by adding one die at a time to the distribution of sorted rolls (a convolution over the dice). The results are memoized per weight configuration.
+    
+    INPUT:
+    probs_bytes   the bytes of the (num_dice, num_faces) float64 matrix of face probabilities
+    num_dice      the number of dice (int)
+    num_faces     the number of faces on each die (int)
+    
+    OUTPUT:
+    rows    one sorted row of face codes per combination, ordered by descending probability (array)
+    probs   the probability of each combination (array)
+    """
+    probs = np.frombuffer(probs_bytes).reshape(num_dice, num_faces)
+    states = {(): 1.0}
+    for j in range(num_dice):
+        die_probs = probs[j].tolist()
+        die_faces = np.flatnonzero(probs[j]).tolist()
+        next_states = {}
+        for state, p in states.items():
+            for face in die_faces:
+                key = tuple(sorted(state + (face,)))
+                next_states[key] = next_states.get(key, 0.0) + p * die_probs[face]
+        states = next_states
+    
+    keys = sorted(states)
+    rows = np.array(keys, dtype = np.intp).reshape(len(keys), num_dice)
+    combo_probs = np.array([states[key] for key in keys])
+    order = np.argsort(-combo_probs, kind = 'stable')
+    return rows[order], combo_probs[order]
 
 class Die:
     """
-    PURPOSE: This class creates a die of any number of sides, with default weights of 1. Methods that can be applied to the die include changing the weight (change_weight), rolling the die (roll_die), and showing the die (show_die).
+    PURPOSE: This class creates a die of any number of sides, with default weights of 1. Methods that can be applied to the die include changing the weight (change_weight), rolling the die (roll_die), and showing the die (show_die). The die keeps its faces and weights in arrays and uses __slots__, since games can use tens of thousands of dice.
+    
+    INPUT:
+    arr   array of die faces
+    
+    OUTPUT: 
+    depends on the method applied
+    """
+    __slots__ = ('__weights', '__faces', '__index', '__cum', '__alias', '__rng', '__diedf')
+    
+    def __init__(self, arr, rng = None):
+        """
+        PURPOSE: Initializes the new die object and saves its faces and weights in arrays. The lookup from faces to positions, the die's random generator and the private dataframe that is shared by other methods of this class are all built when they are first needed, which keeps dice cheap to create.
+        
+        INPUT:
+        arr   array of die faces
+        rng   optional seed or numpy Generator that the die rolls from - defaults to fresh entropy (see make_rng)
+        
+        OUTPUT:
+        none
+        """
+        self.__faces = np.asarray(arr)
+        self.__weights = np.ones(len(self.__faces))
+        self.__index = None
+        self.__cum = None
+        self.__alias = None
+        self.__rng = rng
+        self.__diedf = None
+    
+    @property
+    def n(self):
+        """
+        PURPOSE: Gives the faces of the die as a list.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        a list of the die faces
+        """
+        return self.__faces.tolist()
+    
+    @property
+    def weights(self):
+        """
+        PURPOSE: Gives read access to the weights of the faces, in the order of the faces. The array cannot be written to: change the weights with change_weight or change_weights, so that the die's sampling tables are rebuilt.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        a read-only array of the face weights
+        """
+        weights = self.__weights.view()
+        weights.flags.writeable = False
+        return weights
+    
+    def __positions(self):
+        """
+        PURPOSE: Returns the dict from each face to its position, building it on first use.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        a dict from face values to positions (dict)
+        """
+        if self.__index is None:
+            self.__index = {face: i for i, face in enumerate(self.__faces.tolist())}
+        return self.__index
+    
+    def change_weight(self, face_val, new_weight):
+        """
+        PURPOSE: Change the weight of a single side of the die.
+        
+        INPUTS:
+        face_val    the face value to be changed (str/float/int)
+        new_weight  the desired weight of specified die (float/int)
+        
+        OUTPUT:
+        none
+        print statements if incorrect inputs are provided
+        raises a ValueError if the new weight is negative or not finite, since the die could not be rolled with it
+        """
+        positions = self.__positions()
+        if face_val in positions:
+            
+            if type(new_weight) == float or type(new_weight) == int:
+                if not math.isfinite(new_weight) or new_weight < 0:
+                    raise ValueError('The new weight must be a finite, non-negative number')
+                self.__update_weights(np.array([positions[face_val]]),\
+                                      np.array([float(new_weight)]))
+            else:
+                print('The new weight is not the correct data type - please input a float or an integer')
+                
+        else:
+            print('This face value is not valid because it is not found.')
+    
+    def change_weights(self, new_weights):
+        """
+        PURPOSE: Change the weights of many sides of the die in one vectorized step.
+        
+        INPUTS:
+        new_weights   either a mapping from face values to new weights, or an array with one new weight per face in the order of the faces
+        
+        OUTPUT:
+        none
+        raises a ValueError if a face is not found or a weight is not a finite, non-negative number
+        """
+        if hasattr(new_weights, 'keys'):
+            index = self.__positions()
+            try:
+                positions = np.array([index[face] for face in new_weights.keys()], dtype = np.intp)
+            except KeyError as err:
+                raise ValueError('The face value %r is not valid because it is not found' % (err.args[0],))
+            values = np.asarray(list(new_weights.values()), dtype = float)
+        else:
+            positions = None
+            values = np.asarray(new_weights, dtype = float)
+            if values.shape != self.__weights.shape:
+                raise ValueError('There must be exactly one new weight per face')
+        if not np.all(np.isfinite(values)) or np.any(values < 0):
+            raise ValueError('The new weights must be finite, non-negative numbers')
+        self.__update_weights(positions, values)
+    
+    def __update_weights(self, positions, values):
+        """
+        PURPOSE: Writes new weights into the private weights array (the only place it is written) and drops the cached sampling tables, which are rebuilt lazily on the next roll: the cumulative weights in one np.cumsum pass, the alias table on the next alias roll. Patching the cumulative weights in place would cost about as much as a fresh cumsum and loses precision when a large weight is replaced by a small one. The die dataframe is rebuilt lazily as well.
+        
+        INPUTS:
+        positions   the positions of the faces to change, or None for every face (array)
+        values      the new weights (array)
+        
+        OUTPUT:
+        none
+        """
+        if positions is None:
+            self.__weights[:] = values
+        else:
+            self.__weights[positions] = values
+        self.__cum = None
+        self.__alias = None
+        self.__diedf = None
+    
+    def __cumulative_weights(self):
+        """
+        PURPOSE: Returns the cumulative weights of the faces, computing them once after a weight change.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        cum    array of cumulative weights, whose last entry is the total weight
+        """
+        if self.__cum is None:
+            self.__cum = np.cumsum(self.__weights)
+        if not self.__cum[-1] > 0:
+            raise ValueError('The weights of the die must sum to a positive value')
+        return self.__cum
+    
+    def __alias_table(self):
+        """
+        PURPOSE: Returns the Walker/Vose alias table of the faces, building it on the first alias roll after a weight change.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        prob    array of probabilities of keeping each drawn face
+        alias   array of the faces that stand in for each face otherwise
+        """
+        if self.__alias is None:
+            k = len(self.__weights)
+            total = self.__weights.sum()
+            if not total > 0:
+                raise ValueError('The weights of the die must sum to a positive value')
+            scaled = (self.__weights * (k / total)).tolist()
+            prob = np.ones(k)
+            alias = np.arange(k)
+            small = [i for i in range(k) if scaled[i] < 1.0]
+            large = [i for i in range(k) if scaled[i] >= 1.0]
+            while small and large:
+                s = small.pop()
+                l = large.pop()
+                prob[s] = scaled[s]
+                alias[s] = l
+                scaled[l] = (scaled[l] + scaled[s]) - 1.0
+                if scaled[l] < 1.0:
+                    small.append(l)
+                else:
+                    large.append(l)
+            self.__alias = (prob, alias)
+        return self.__alias
+    
+    def _sample_codes(self, num_rolls, rng = None, strategy = 'auto'):
+        """
+        PURPOSE: Draws all of the rolls at once as face positions (codes), either by inverse-CDF lookup of a batch of uniform numbers scaled to the total weight ("cdf") or from the alias table ("alias").
+        
+        INPUT:
+        num_rolls   the number of times to roll the die (int)
+        rng         optional numpy Generator to draw from - defaults to the die's own generator
+        strategy    "cdf", "alias" or "auto" to pick by face count and batch size - defaults to "auto" (str)
+        
+        OUTPUT:
+        codes      an integer array of positions into the die's faces
+        """
+        if rng is None:
+            if not isinstance(self.__rng, np.random.Generator):
+                self.__rng = make_rng(self.__rng)
+            rng = self.__rng
+        if strategy == 'auto':
+            strategy = _pick_strategy(len(self.__weights), num_rolls)
+        if strategy == 'cdf':
+            cum = self.__cumulative_weights()
+            codes = np.searchsorted(cum, rng.random(num_rolls) * cum[-1], side = 'right')
+            # a uniform just below 1 can round up to the total weight
+            return np.minimum(codes, np.searchsorted(cum, cum[-1]))
+        elif strategy == 'alias':
+            prob, alias = self.__alias_table()
+            picks = rng.integers(0, len(prob), num_rolls)
+            return np.where(rng.random(num_rolls) < prob[picks], picks, alias[picks])
+        else:
+            raise ValueError("Strategy must be set to 'cdf', 'alias' or 'auto'")
+    
+    def roll_die(self, num_rolls = 1, as_list = False, strategy = 'auto', rng = None):
+        """
+        PURPOSE: Rolls the die one or more times
+        
+        INPUT:
+        num_rolls   the number of times to roll the die - defaults to 1 (int)
+        as_list     optional flag to return a python list instead of an array - defaults to False (bool)
+        strategy    sampling strategy "cdf", "alias" or "auto" - defaults to "auto" (str)
+        rng         optional seed or numpy Generator to roll from instead of the die's own generator
+        
+        OUTPUT:
+        results    an array (or list) of the outcomes of the die rolls
+        """
+        if rng is not None:
+            rng = make_rng(rng)
+        with _phase('sample', num_rolls):
+            results = self.__faces[self._sample_codes(num_rolls, rng, strategy)]
+        if as_list:
+            return results.tolist()
+        return results
+    
+    @property
+    def faces(self):
+        """
+        PURPOSE: Gives read access to the array of the die's faces, in the order the codes returned by sampling refer to.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        the array of die faces
+        """
+        return self.__faces
+    
+    def show_die(self):
+        """
+        PURPOSE: Show the user the die's current set of faces/weights.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        the dataframe of the die's faces and weights, rebuilt after the weights change
+        """
+        pd = _pandas()
+        if self.__diedf is None:
+            self.__diedf = pd.DataFrame({'side':self.__faces,\
+                                         'weight':self.__weights.copy()})
+            self.__diedf = self.__diedf.set_index('side')
+        return self.__diedf
+    
+    
+class Game:
+    """
+    PURPOSE: This class plays the dice game by rolling one or more of the same kind of dice one or more times. Note that each die in a given game will have the same number of sides and associated faces, but each die may have its own weights. This class keeps the results of the most recent play.
+    
+    INPUT:
+    die_lst    a list of die objects
+    
+    OUTPUT:
+    depends on the method applied
+    """
+    
+    def __init__(self, die_lst):
+        """
+        PURPOSE: Initializes a game.
+        
+        INPUT:
+        die_lst    a list of die objects
+        
+        OUTPUT:
+        none
+        """
+        self.die_lst = die_lst
+        self.__generation = 0
+        
+    def __sampling_plan(self):
+        """
+        PURPOSE: Groups the dice of the game so that dice sharing the same weights are sampled together in a single batch.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        faces    the face table shared by every die in the game (array)
+        groups   a list of [die, remap, columns] entries, where remap translates the die's own codes into the shared face table (None when the faces already line up)
+        """
+        faces = self.die_lst[0].faces
+        position = {face: i for i, face in enumerate(faces.tolist())}
+        groups = {}
+        for j, die in enumerate(self.die_lst):
+            if die.faces is faces or np.array_equal(die.faces, faces):
+                remap = None
+            else:
+                try:
+                    remap = np.array([position[face] for face in die.faces.tolist()])
+                except KeyError:
+                    raise ValueError('Every die in a game must have the same faces')
+            key = (die.weights.tobytes(), None if remap is None else remap.tobytes())
+            groups.setdefault(key, [die, remap, []])[2].append(j)
+        return faces, list(groups.values())
+        
+    def _face_probabilities(self):
+        """
+        PURPOSE: Gives the normalized weights of every die, lined up with the face table of the game.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        faces    the face table shared by every die in the game (array)
+        probs    matrix with one row per die and one column per face, each row summing to 1 (array)
+        """
+        faces, groups = self.__sampling_plan()
+        probs = np.zeros((len(self.die_lst), len(faces)))
+        for die, remap, cols in groups:
+            total = die.weights.sum()
+            if not total > 0:
+                raise ValueError('The weights of the die must sum to a positive value')
+            die_probs = die.weights / total
+            if remap is None:
+                probs[cols] = die_probs
+            else:
+                probs[np.ix_(cols, remap)] = die_probs
+        return faces, probs
+        
+    def play(self, num_rolls, workers = 1, seed = None, executor = None, bit_generator = 'PCG64',\
+             sampling = 'plain', proposal = None, results = 'codes'):
+        """
+        PURPOSE: Rolls the dice however many times are specified in num_rolls and saves the results of the game as a private matrix of face codes (one row per roll, one column per die) that index into one shared face table. The codes are stored as uint8 or uint16 depending on the number of faces. Dice that share weights are rolled together in one batch.
+        
+        With more than one worker the rolls are split into equal blocks that are rolled in parallel, each from its own child of the seed's SeedSequence, and the blocks are joined back in order. The results are the same bit for bit for a given seed, bit generator and number of workers.
+        
+        The sampling mode can trade plain rolls for lower-variance estimates. "stratified" rolls each die from a Latin hypercube of uniforms and "antithetic" pairs every roll with its mirror image; both keep every roll at weight 1. "importance" rolls each die from the proposal weights and saves the likelihood ratio of each roll as roll_weights, which Analyzer uses to keep its estimates unbiased. These modes run on one worker.
+        
+        With results="histogram" the individual rolls are not kept. Only how many times each face came up in each roll is saved, sparsely, as a FaceHistogram (see the histogram property), along with how many times each die landed on each face. For games with many dice this takes far less memory than a dense count of every face per roll, and Analyzer computes jackpots and combos from it directly.
+        
+        INPUT:
+        num_rolls       number of rolls for the group of dice (int)
+        workers         optional number of blocks to roll in parallel - defaults to 1 (int)
+        seed            optional int, SeedSequence or numpy Generator for the rolls - defaults to None, which rolls each die from its own generator on one worker
+        executor        optional concurrent.futures executor to run the blocks on - defaults to a new ProcessPoolExecutor
+        bit_generator   name of the numpy bit generator used with a seed, one of BIT_GENERATORS - defaults to "PCG64" (str)
+        sampling        "plain", "stratified", "antithetic" or "importance" - defaults to "plain" (str)
+        proposal        optional proposal weights for "importance", one row per die (or one row shared by all dice) in the order of the game's faces - defaults to a mix tilted toward jackpots (array)
+        results         "codes" to keep every roll or "histogram" to keep only the face histograms of the rolls - defaults to "codes" (str)
+        
+        OUTPUT:
+        none - saves the results to a private matrix
+        """
+        faces, groups = self.__sampling_plan()
+        if workers < 1:
+            raise ValueError('The number of workers must be at least 1')
+        if results not in ('codes', 'histogram'):
+            raise ValueError("Results must be set to either 'codes' or 'histogram'")
+        histogram = results == 'histogram'
+        if histogram and sampling != 'plain':
+            raise ValueError('Histogram results are only kept for plain sampling')
+        weights = None
+        if sampling != 'plain':
+            if sampling not in ('stratified', 'antithetic', 'importance'):
+                raise ValueError("Sampling must be set to 'plain', 'stratified', 'antithetic' or 'importance'")
+            if workers != 1:
+                raise ValueError('The variance-reduction sampling modes run on one worker')
+            faces, probs = self._face_probabilities()
+            if sampling == 'importance':
+                proposal = self.__proposal(probs, proposal)
+            with _phase('sample', num_rolls * len(self.die_lst)):
+                codes, weights = _roll_reduced(probs, num_rolls, make_rng(seed, bit_generator),\
+                                               sampling, proposal)
+        elif workers == 1:
+            rng = None if seed is None else make_rng(seed, bit_generator)
+            if histogram:
+                codes = _roll_histogram(groups, len(self.die_lst), len(faces), num_rolls, rng)
+            else:
+                codes = _roll_codes(groups, len(self.die_lst), len(faces), num_rolls, rng)
+        else:
+            sizes = [num_rolls // workers + (i < num_rolls % workers) for i in range(workers)]
+            seeds = _seed_sequence(seed).spawn(workers)
+            from concurrent.futures import ProcessPoolExecutor
+            pool = executor if executor is not None else ProcessPoolExecutor(max_workers = workers)
+            try:
+                with _phase('sample', num_rolls * len(self.die_lst)):
+                    blocks = list(pool.map(_play_block, [groups] * workers, [len(self.die_lst)] * workers,\
+                                           [len(faces)] * workers, sizes, seeds, [bit_generator] * workers,\
+                                           [histogram] * workers))
+            finally:
+                if executor is None:
+                    pool.shutdown()
+            with _phase('assemble', num_rolls * len(self.die_lst)):
+                if histogram:
+                    codes = _join_histograms(blocks, len(self.die_lst), len(faces))
+                else:
+                    codes = np.concatenate(blocks)
+        
+        if histogram:
+            self.__store(faces, None, histogram = codes)
+        else:
+            self.__store(faces, codes, weights)
+    
+    def __store(self, faces, codes, weights = None, histogram = None):
+        """
+        PURPOSE: Saves the results of a play as the results of the game, dropping the dataframe views of the previous play and moving on to the next play generation.
+        
+        INPUT:
+        faces       the face table the codes refer to (array)
+        codes       matrix of face codes with one row per roll and one column per die, or None for histogram results (array)
+        weights     the likelihood ratio of each roll, or None (array)
+        histogram   the FaceHistogram of the rolls for histogram results, or None
+        
+        OUTPUT:
+        none
+        """
+        self.__faces = faces
+        self.__codes = codes
+        self.__weights = weights
+        self.__histogram = histogram
+        self.__views = {}
+        self.__generation += 1
+    
+    async def play_async(self, num_rolls, chunk_size = 2 ** 20, seed = None, bit_generator = 'PCG64',\
+                         executor = None):
+        """
+        PURPOSE: Plays the game like play, but without blocking an asyncio event loop: the rolls are made one chunk at a time on an executor and the loop is free between chunks. Cancelling the task stops it after the chunk in progress, and the results of the previous play are kept.
+        
+        Every chunk is rolled from its own child of the seed's SeedSequence, so a game is reproduced by the same seed and chunk size.
+        
+        INPUT:
+        num_rolls       number of rolls for the group of dice (int)
+        chunk_size      optional number of rolls per chunk - defaults to 2 ** 20 (int)
+        seed            optional int, SeedSequence or numpy Generator for the rolls
+        bit_generator   name of the numpy bit generator - defaults to "PCG64" (str)
+        executor        optional concurrent.futures executor (threads or processes) - defaults to the event loop's default executor
+        
+        OUTPUT:
+        none - saves the results to a private matrix
+        """
+        if chunk_size < 1:
+            raise ValueError('The chunk size must be at least 1')
+        faces, groups = self.__sampling_plan()
+        import asyncio
+        loop = asyncio.get_running_loop()
+        sizes = [min(chunk_size, num_rolls - start) for start in range(0, num_rolls, chunk_size)]
+        blocks = []
+        for size, seed_seq in zip(sizes, _seed_sequence(seed).spawn(len(sizes))):
+            blocks.append(await loop.run_in_executor(executor, _play_block, groups, len(self.die_lst),\
+                                                     len(faces), size, seed_seq, bit_generator))
+        if blocks:
+            codes = np.concatenate(blocks)
+        else:
+            codes = np.empty((0, len(self.die_lst)), dtype = _code_dtype(len(faces)))
+        self.__store(faces, codes)
+    
+    async def analyze_async(self, num_rolls, chunk_size = 2 ** 20, seed = None, bit_generator = 'PCG64',\
+                            executor = None):
+        """
+        PURPOSE: Rolls and analyzes the game one chunk at a time on an executor, without blocking an asyncio event loop or keeping the rolls, and yields the running statistics after every chunk so that progress can be reported. Each chunk is rolled and counted on the executor; only the small partial statistics come back. Stopping the iteration or cancelling the task stops after the chunk in progress.
+        
+        INPUT:
+        num_rolls       number of rolls for the group of dice (int)
+        chunk_size      optional number of rolls per chunk - defaults to 2 ** 20 (int)
+        seed            optional int, SeedSequence or numpy Generator for the rolls
+        bit_generator   name of the numpy bit generator - defaults to "PCG64" (str)
+        executor        optional concurrent.futures executor (threads or processes) - defaults to the event loop's default executor
+        
+        OUTPUT:
+        an async iterator of the same StreamAnalyzer, updated with one more chunk each time (its num_rolls is the progress)
+        """
+        if chunk_size < 1:
+            raise ValueError('The chunk size must be at least 1')
+        faces, groups = self.__sampling_plan()
+        import asyncio
+        loop = asyncio.get_running_loop()
+        stream = StreamAnalyzer(faces)
+        sizes = [min(chunk_size, num_rolls - start) for start in range(0, num_rolls, chunk_size)]
+        for size, seed_seq in zip(sizes, _seed_sequence(seed).spawn(len(sizes))):
+            stream.merge(await loop.run_in_executor(executor, _stream_block, groups, len(self.die_lst),\
+                                                    faces, size, seed_seq, bit_generator))
+            yield stream
+    
+    @staticmethod
+    def __proposal(probs, proposal):
+        """
+        PURPOSE: Checks and normalizes the proposal weights for importance sampling. Each die's proposal must be able to roll every face the die itself can roll, or the likelihood ratios would be biased.
+        
+        The default proposal is tilted toward jackpots: every die rolls from the geometric mean of all the dice's face probabilities, which favors the faces every die can land on, mixed with 10% equal weights on the faces the die can roll so that no outcome is left out.
+        
+        INPUT:
+        probs      matrix of face probabilities, one row per die (array)
+        proposal   the proposal weights given to play, or None (array)
+        
+        OUTPUT:
+        matrix of proposal probabilities, one row per die (array)
+        """
+        if proposal is None:
+            with np.errstate(divide = 'ignore'):
+                tilt = np.exp(np.log(probs).mean(axis = 0))
+            tilt = tilt / tilt.sum() if tilt.sum() > 0 else np.zeros_like(tilt)
+            support = (probs > 0) / (probs > 0).sum(axis = 1, keepdims = True)
+            proposal = 0.9 * tilt + 0.1 * support
+        proposal = np.broadcast_to(np.asarray(proposal, dtype = float), probs.shape)
+        if np.any(proposal < 0) or np.any((proposal == 0) & (probs > 0)):
+            raise ValueError('The proposal must give positive weight to every face a die can roll')
+        return proposal / proposal.sum(axis = 1, keepdims = True)
+    
+    @property
+    def roll_weights(self):
+        """
+        PURPOSE: Gives the likelihood ratio of each roll of the most recent play, which is None unless the game was played with importance sampling.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        an array with one weight per roll, or None
+        """
+        return self.__weights
+    
+    @property
+    def generation(self):
+        """
+        PURPOSE: Gives the number of times the game has been played (a loaded game counts as played once), so that results computed from an earlier play can be told apart from the current one.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        the play generation of the game (int)
+        """
+        return self.__generation
+    
+    @property
+    def codes(self):
+        """
+        PURPOSE: Gives read access to the matrix of face codes of the most recent play, which refers to the faces of the game. For a game loaded with Game.load this is a read-only memory map of the file.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        matrix of face codes with one row per roll and one column per die (array), or None when the game was played with results="histogram"
+        """
+        return self.__codes
+    
+    @property
+    def histogram(self):
+        """
+        PURPOSE: Gives read access to the face histograms of the most recent play when the game was played with results="histogram".
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        a FaceHistogram of (indptr, indices, data, die_totals), or None when the game kept its rolls
+        """
+        return self.__histogram
+    
+    def save(self, path):
+        """
+        PURPOSE: Saves the results of the most recent play to a directory in a compact binary format: the matrix of face codes (codes.npy), the face table (faces.npy), every die's faces and weights (die_faces.npy, die_weights.npy), the roll weights of importance sampling if any (roll_weights.npy), and a small JSON metadata file (meta.json).
+        
+        INPUT:
+        path    the directory to save to, which is created if needed (str)
+        
+        OUTPUT:
+        none
+        """
+        if self.__codes is None:
+            raise ValueError('A game played with histogram results has no rolls to save')
+        os.makedirs(path, exist_ok = True)
+        np.save(os.path.join(path, 'codes.npy'), self.__codes, allow_pickle = False)
+        np.save(os.path.join(path, 'faces.npy'), self.__faces, allow_pickle = False)
+        np.save(os.path.join(path, 'die_faces.npy'), np.stack([die.faces for die in self.die_lst]),\
+                allow_pickle = False)
+        np.save(os.path.join(path, 'die_weights.npy'), np.stack([die.weights for die in self.die_lst]),\
+                allow_pickle = False)
+        if self.__weights is not None:
+            np.save(os.path.join(path, 'roll_weights.npy'), self.__weights, allow_pickle = False)
+        meta = {'format': 1,
+                'num_rolls': int(self.__codes.shape[0]),
+                'num_dice': int(self.__codes.shape[1]),
+                'code_dtype': self.__codes.dtype.name,
+                'roll_weights': self.__weights is not None}
+        with open(os.path.join(path, 'meta.json'), 'w') as f:
+            json.dump(meta, f)
+    
+    @classmethod
+    def load(cls, path, mmap = True):
+        """
+        PURPOSE: Loads a game saved with Game.save, rebuilding its dice and the results of its most recent play. By default the face codes are memory-mapped read-only, so a results file much larger than memory can be analyzed without reading it all in.
+        
+        INPUT:
+        path    the directory the game was saved to (str)
+        mmap    optional flag to memory-map the face codes rather than read them - defaults to True (bool)
+        
+        OUTPUT:
+        a Game object holding the saved results
+        """
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        die_faces = np.load(os.path.join(path, 'die_faces.npy'))
+        die_weights = np.load(os.path.join(path, 'die_weights.npy'))
+        dice = []
+        for faces, weights in zip(die_faces, die_weights):
+            die = Die(faces)
+            die.change_weights(weights)
+            dice.append(die)
+        
+        game = cls(dice)
+        game.__faces = np.load(os.path.join(path, 'faces.npy'))
+        game.__codes = np.load(os.path.join(path, 'codes.npy'), mmap_mode = 'r' if mmap else None)
+        game.__weights = None
+        if meta['roll_weights']:
+            game.__weights = np.load(os.path.join(path, 'roll_weights.npy'),\
+                                     mmap_mode = 'r' if mmap else None)
+        game.__histogram = None
+        game.__views = {}
+        game.__generation = 1
+        return game
+    
+    def play_chunks(self, num_rolls, chunk_size = 2 ** 20, seed = None, bit_generator = 'PCG64'):
+        """
+        PURPOSE: Rolls the dice num_rolls times in fixed-size chunks and hands each chunk back as soon as it is rolled, so games far larger than memory can be run. The chunks are not saved to the game; pass them to a StreamAnalyzer to keep running statistics.
+        
+        INPUT:
+        num_rolls       number of rolls for the group of dice (int)
+        chunk_size      the largest number of rolls in one chunk - defaults to 2 ** 20 (int)
+        seed            optional int, SeedSequence or numpy Generator for the rolls - defaults to None, which rolls each die from its own generator
+        bit_generator   name of the numpy bit generator used with a seed - defaults to "PCG64" (str)
+        
+        OUTPUT:
+        a generator of matrices of face codes, one row per roll and one column per die, that refer to the faces of the game
+        """
+        if chunk_size < 1:
+            raise ValueError('The chunk size must be at least 1')
+        faces, groups = self.__sampling_plan()
+        rng = None if seed is None else make_rng(seed, bit_generator)
+        for start in range(0, num_rolls, chunk_size):
+            yield _roll_codes(groups, len(self.die_lst), len(faces),\
+                              min(chunk_size, num_rolls - start), rng)
+    
+    def analyze_chunks(self, num_rolls, chunk_size = 2 ** 20, workers = 1, seed = None, executor = None,\
+                       bit_generator = 'PCG64'):
+        """
+        PURPOSE: Rolls and analyzes the game one chunk at a time without keeping the rolls, spreading the chunks over a pool of workers. Each chunk is rolled and counted by a worker and only its small StreamAnalyzer comes back to be merged, so memory stays bounded by the chunks in progress.
+        
+        Every chunk is rolled from its own child of the seed's SeedSequence, so the statistics are the same for a given seed and chunk size whatever the number of workers (and the same as analyze_async).
+        
+        INPUT:
+        num_rolls       number of rolls for the group of dice (int)
+        chunk_size      optional number of rolls per chunk - defaults to 2 ** 20 (int)
+        workers         optional number of chunks to roll in parallel - defaults to 1 (int)
+        seed            optional int, SeedSequence or numpy Generator for the rolls
+        executor        optional concurrent.futures executor to run the chunks on - defaults to a new ProcessPoolExecutor when workers is more than 1
+        bit_generator   name of the numpy bit generator - defaults to "PCG64" (str)
+        
+        OUTPUT:
+        a StreamAnalyzer over all the rolls
+        """
+        if chunk_size < 1:
+            raise ValueError('The chunk size must be at least 1')
+        if workers < 1:
+            raise ValueError('The number of workers must be at least 1')
+        faces, groups = self.__sampling_plan()
+        sizes = [min(chunk_size, num_rolls - start) for start in range(0, num_rolls, chunk_size)]
+        seeds = _seed_sequence(seed).spawn(len(sizes))
+        stream = StreamAnalyzer(faces)
+        if workers == 1 and executor is None:
+            for size, seed_seq in zip(sizes, seeds):
+                stream.merge(_stream_block(groups, len(self.die_lst), faces, size, seed_seq, bit_generator))
+            return stream
+        from concurrent.futures import ProcessPoolExecutor
+        pool = executor if executor is not None else ProcessPoolExecutor(max_workers = workers)
+        try:
+            for part in pool.map(_stream_block, [groups] * len(sizes), [len(self.die_lst)] * len(sizes),\
+                                 [faces] * len(sizes), sizes, seeds, [bit_generator] * len(sizes)):
+                stream.merge(part)
+        finally:
+            if executor is None:
+                pool.shutdown()
+        return stream
+    
+    def play_until(self, stat = 'jackpot', half_width = None, rel_error = None, confidence = 0.95,\
+                   batch_size = 10 ** 5, max_rolls = 10 ** 9, seed = None, bit_generator = 'PCG64'):
+        """
+        PURPOSE: Rolls the dice in batches, updating an estimate of how often a statistic occurs, and stops as soon as the confidence interval is as tight as requested. The interval is the Wilson score interval for a proportion, which stays sensible for rare events. The rolls are not saved to the game.
+        
+        INPUT:
+        stat            "jackpot", or a combination of faces (list/tuple, in any order) whose frequency is estimated - defaults to "jackpot"
+        half_width      optional largest acceptable half-width of the interval (float)
+        rel_error       optional largest acceptable half-width relative to the estimate (float)
+        confidence      the confidence level of the interval - defaults to 0.95 (float)
+        batch_size      the number of rolls between checks - defaults to 10 ** 5 (int)
+        max_rolls       the most rolls to make if the target is never reached - defaults to 10 ** 9 (int)
+        seed            optional int, SeedSequence or numpy Generator for the rolls
+        bit_generator   name of the numpy bit generator used with a seed - defaults to "PCG64" (str)
+        
+        OUTPUT:
+        an Estimate of (estimate, low, high, num_rolls)
+        """
+        if half_width is None and rel_error is None:
+            raise ValueError('Either half_width or rel_error must be given')
+        if batch_size < 1:
+            raise ValueError('The batch size must be at least 1')
+        if max_rolls < 1:
+            raise ValueError('The most rolls to make must be at least 1')
+        if not 0 < confidence < 1:
+            raise ValueError('The confidence level must be between 0 and 1')
+        z = NormalDist().inv_cdf((1 + confidence) / 2)
+        if stat == 'jackpot':
+            target = None
+        else:
+            position = {face: i for i, face in enumerate(self.faces.tolist())}
+            try:
+                target = np.sort([position[face] for face in stat])
+            except KeyError:
+                raise ValueError('The combination must be made of faces of the game')
+            if len(target) != len(self.die_lst):
+                raise ValueError('The combination must have one face per die')
+        
+        hits = 0
+        rolls = 0
+        for chunk in self.play_chunks(max_rolls, batch_size, seed, bit_generator):
+            with _phase('analyze', chunk.size):
+                if target is None:
+                    hits += int(np.count_nonzero(_jackpot_mask(chunk)))
+                else:
+                    hits += int(np.count_nonzero(np.all(np.sort(chunk, axis = 1) == target, axis = 1)))
+            rolls += len(chunk)
+            
+            rate = hits / rolls
+            center = (rate + z * z / (2 * rolls)) / (1 + z * z / rolls)
+            spread = z * math.sqrt(rate * (1 - rate) / rolls + z * z / (4 * rolls * rolls))\
+            / (1 + z * z / rolls)
+            if half_width is not None and spread <= half_width:
+                break
+            if rel_error is not None and hits > 0 and spread <= rel_error * rate:
+                break
+        return Estimate(rate, max(center - spread, 0.0), min(center + spread, 1.0), rolls)
+    
+    @property
+    def faces(self):
+        """
+        PURPOSE: Gives read access to the face table of the game, which the face codes of play_chunks refer to.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        the array of faces shared by the dice of the game
+        """
+        return self.die_lst[0].faces
+    
+    def show_results(self, df_form = 'wide'):
+        """
+        PURPOSE: Shows the user the results of the most recent play in the game by passing the dataframe to the user in a specified format. The dataframes hold categorical columns built straight from the face codes, and each form is built once per play and then reused.
+        
+        INPUT:
+        df_form    optional argument that takes the form "wide" or "narrow" for the dataframe
+        
+        OUTPUT:
+        either the narrow or wide form of the dataframe containing play results
+        """
+        pd = _pandas()
+        if df_form not in ('wide', 'narrow'):
+            raise Exception("Form must be set to either 'wide' or 'narrow'")
+        if self.__codes is None:
+            raise ValueError('A game played with histogram results has no rolls to show')
+        if df_form not in self.__views:
+            num_rolls, num_dice = self.__codes.shape
+            with _phase('reshape', num_rolls * num_dice):
+                if df_form == 'narrow':
+                    index = pd.MultiIndex.from_product([range(num_dice), range(num_rolls)],\
+                                                       names = ['die_number', 'roll_number'])
+                    faces_rolled = pd.Categorical.from_codes(self.__codes.T.ravel(),\
+                                                             categories = self.__faces)
+                    self.__views[df_form] = pd.DataFrame({'face_rolled': faces_rolled}, index = index)
+                else:
+                    wide_df = pd.DataFrame({j: pd.Categorical.from_codes(self.__codes[:, j],\
+                                                                         categories = self.__faces)\
+                                            for j in range(num_dice)})
+                    wide_df.index.name = 'roll_number'
+                    wide_df.columns.name = 'die_number'
+                    self.__views[df_form] = wide_df
+        return self.__views[df_form]
+            
+
+class Analyzer:
+    """
+    PURPOSE: This class takes the results of a single game and computes various descriptive statistical properties about it. The results are brought into one matrix of face codes when the analyzer is made, and every statistic works on that matrix. Each statistic is computed once and remembered; an analyzer made from a Game forgets them and reads the new results whenever the game is played again.
     
     INPUT:
-    arr   array of die faces
+    game_results    a Game object, the results shown by a Game (wide or narrow dataframe), a matrix of face codes (array), or a FaceHistogram
     
-    OUTPUT: 
-    depends on the method applied
+    OUTPUT:
+    depends on method applied
     """
-    __diedf = 0
+    def __init__(self, game_results, weights = None, faces = None):
+        """
+        PURPOSE: Initializes the analyzer. A Game or a matrix of face codes is used as it is, without copying, whenever the faces are in sorted order; a dataframe is encoded once here rather than in each method.
+        
+        INPUT:
+        game_results   a Game object, the results shown by a Game (wide or narrow dataframe), a matrix of face codes (array), or a FaceHistogram
+        weights        optional likelihood ratio of each roll - defaults to the game's roll_weights for a Game (array)
+        faces          optional face table that a matrix of face codes or a FaceHistogram refers to - defaults to the codes being their own faces (array)
+        
+        OUTPUT:
+        none
+        """
+        self.game_results = game_results
+        self.__generation = None
+        if isinstance(game_results, Game):
+            self.__load_game(weights)
+            return
+        elif 'pandas' in sys.modules and isinstance(game_results, sys.modules['pandas'].DataFrame):
+            with _phase('reshape', game_results.size):
+                self.__wide_df, codes, faces = self.__encode(game_results)
+        elif isinstance(game_results, FaceHistogram):
+            if faces is None:
+                faces = np.arange(game_results.die_totals.shape[1])
+            self.__wide_df = None
+            self.__set_codes(None, faces, weights, game_results)
+            return
+        else:
+            codes = np.asarray(game_results)
+            if codes.ndim != 2:
+                raise ValueError('A matrix of face codes must have one row per roll and one column per die')
+            if faces is None:
+                faces = np.arange(int(codes.max()) + 1 if codes.size else 0)
+            self.__wide_df = None
+        self.__set_codes(codes, faces, weights)
     
-    def __init__(self, arr):
+    def __set_codes(self, codes, faces, weights, histogram = None):
         """
-        PURPOSE: Initializes the new die object and saves faces and weights to a private dataframe that is shared by other methods of this class.
+        PURPOSE: Stores the matrix of face codes (or the face histograms) that every statistic works on, and empties the cache of statistics. The codes are kept as they are, in the order of the given face table, so a Game's codes (or a memory map of them) are never copied; the statistics are translated to the sorted face table only once they are counted, which touches just the small outputs.
         
         INPUT:
-        arr   array of die faces
+        codes       matrix of face codes, one row per roll, or None for histograms (array)
+        faces       the face table the codes refer to (array)
+        weights     the likelihood ratio of each roll, or None (array)
+        histogram   optional FaceHistogram of the rolls, used instead of codes
         
         OUTPUT:
         none
         """
-        self.n = arr.tolist()
-        self.weights = np.ones(len(self.n))
-        self.__diedf = pd.DataFrame({'side':self.n,\
-                                   'weight':self.weights})
-        self.__diedf = self.__diedf.set_index('side')
+        self.__faces, self.__rank = _sort_faces(np.asarray(faces))
+        if histogram is not None:
+            if weights is not None:
+                raise ValueError('Roll weights are not supported with histogram results')
+            self.__num_rolls, num_dice = len(histogram.indptr) - 1, len(histogram.die_totals)
+        else:
+            self.__num_rolls, num_dice = codes.shape
+        self.__codes = codes
+        self.__histogram = histogram
+        self.__size = self.__num_rolls * num_dice
+        self.weights = None if weights is None else np.asarray(weights, dtype = float)
+        self.__cache = {}
     
-    def change_weight(self, face_val, new_weight):
+    def __decode(self, codes):
         """
-        PURPOSE: Change the weight of a single side of the die.
+        PURPOSE: Looks up the faces of some face codes.
         
-        INPUTS:
-        face_val    the face value to be changed (str/float/int)
-        new_weight  the desired weight of specified die (float/int)
+        INPUT:
+        codes    face codes in the order of the analyzed face table (array)
+        
+        OUTPUT:
+        the faces (array)
+        """
+        if self.__rank is None:
+            return self.__faces[codes]
+        return self.__faces[self.__rank[codes]]
+    
+    def __rank_rows(self, counted, sort_rows):
+        """
+        PURPOSE: Translates counted rows of face codes to the sorted face table and puts them back in the order of _by_count (descending count, then ascending rows).
+        
+        INPUT:
+        counted     the (rows, counts) or (rows, counts, sums) of a counting function
+        sort_rows   whether each row must be sorted again, as combinations are (bool)
+        
+        OUTPUT:
+        the translated rows, counts and, if given, sums
+        """
+        if self.__rank is None:
+            return counted
+        rows = self.__rank[counted[0]]
+        if sort_rows:
+            rows = np.sort(rows, axis = 1)
+        return _by_count(rows, *counted[1:]) if len(counted) == 3 else _by_count(rows, counted[1], None)
+    
+    def __load_game(self, weights = None):
+        """
+        PURPOSE: Reads the results of the most recent play of the game and notes its play generation.
+        
+        INPUT:
+        weights   optional likelihood ratio of each roll - defaults to the game's roll_weights (array)
         
         OUTPUT:
         none
-        print statements if incorrect inputs are provided
         """
-        if face_val in self.n:
-            
-            if type(new_weight) == float:
-                self.__diedf.loc[face_val, 'weight'] = new_weight
-            elif type(new_weight) == int:
-                new_weight = float(new_weight)
-                self.__diedf.loc[face_val, 'weight'] = new_weight
-            else:
-                print('The new weight is not the correct data type - please input a float or an integer')
-                
+        game = self.game_results
+        if weights is None:
+            weights = game.roll_weights
+        self.__wide_df = None
+        self.__generation = game.generation
+        self.__set_codes(game.codes, game.faces, weights, game.histogram)
+    
+    def __cached(self, name, compute):
+        """
+        PURPOSE: Returns a statistic or an intermediate result shared by several statistics, computing it on first use. When the analyzer was made from a Game that has been played again since, the new results are read and everything is computed afresh.
+        
+        INPUT:
+        name      the name of the result (str)
+        compute   a function that takes no arguments and computes it
+        
+        OUTPUT:
+        the result
+        """
+        if self.__generation is not None and self.__generation != self.game_results.generation:
+            self.__load_game()
+        if name not in self.__cache:
+            with _phase('analyze', self.__size):
+                self.__cache[name] = compute()
+        return self.__cache[name]
+    
+    @staticmethod
+    def __encode(game_results):
+        """
+        PURPOSE: Brings a dataframe of game results into wide form (one row per roll, one column per die) and encodes it as a matrix of integer face codes. Categorical results from Game.show_results are used as they are; other dataframes are factorized, in sorted order of the faces when they can be sorted.
+        
+        INPUT:
+        game_results   the results shown by a Game, wide or narrow (dataframe) - narrow results are told apart by their (die_number, roll_number) MultiIndex, so a one-die wide frame stays wide
+        
+        OUTPUT:
+        wide_df   the game results in wide form (dataframe)
+        codes     the matrix of face codes (array)
+        faces     the face table the codes refer to (array)
+        """
+        pd = _pandas()
+        if isinstance(game_results.index, pd.MultiIndex):
+            wide_df = game_results.iloc[:, 0].unstack(level = 0)
         else:
-            print('This face value is not valid because it is not found.')
+            wide_df = game_results
+        
+        dtypes = list(wide_df.dtypes)
+        if all(isinstance(dtype, pd.CategoricalDtype) and dtype == dtypes[0] for dtype in dtypes):
+            codes = np.column_stack([wide_df[col].cat.codes.to_numpy() for col in wide_df.columns])
+            faces = np.asarray(dtypes[0].categories)
+        else:
+            values = wide_df.to_numpy().ravel()
+            try:
+                codes, faces = pd.factorize(values, sort = True)
+            except TypeError:
+                codes, faces = pd.factorize(values)
+            codes = codes.reshape(wide_df.shape)
+            faces = np.asarray(faces)
+        return wide_df, codes, faces
     
-    def roll_die(self, num_rolls = 1):
+    def __jackpot_mask(self):
         """
-        PURPOSE: Rolls the die one or more times
+        PURPOSE: Marks the rolls that are jackpots, i.e. whose face codes all equal the code of the first die.
         
         INPUT:
-        num_rolls   the number of times to roll the die - defaults to 1 (int)
+        none
+        
+        OUTPUT:
+        a boolean array with one entry per roll
+        """
+        if self.__histogram is not None:
+            return self.__cached('jackpots', lambda: np.diff(self.__histogram.indptr) == 1)
+        return self.__cached('jackpots', lambda: _jackpot_mask(self.__codes))
+    
+    def __roll_index(self):
+        """
+        PURPOSE: Gives the index of the rolls, which is the index of the wide dataframe when one was given.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        the roll index (pandas Index)
+        """
+        pd = _pandas()
+        if self.__wide_df is not None:
+            return self.__wide_df.index
+        return pd.RangeIndex(self.__num_rolls, name = 'roll_number')
+    
+    def comp_jackpot(self):
+        """
+        PURPOSE: Computes how many times the game resulted in all faces of the dice being identical, or in other words, the "jackpot." A roll is a jackpot when every face code in its row equals the first one.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        the number of times the game had a jackpot (int)
+        """
+        self.jackpot_df, num_jackpots = self.__cached('jackpot_df', self.__find_jackpots)
+        return num_jackpots
+    
+    def __find_jackpots(self):
+        """
+        PURPOSE: Picks the jackpot rolls out of the game results, for comp_jackpot.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        jackpot_df     the jackpot rolls, indexed by roll number (dataframe)
+        num_jackpots   the number of jackpots (int)
+        """
+        pd = _pandas()
+        is_jackpot = self.__jackpot_mask()
+        
+        if self.__wide_df is not None:
+            jackpot_df = self.__wide_df[is_jackpot]
+        elif self.__histogram is not None:
+            indptr, indices, data, die_totals = self.__histogram
+            jackpot_faces = self.__decode(indices[indptr[:-1][is_jackpot]])
+            jackpot_df = pd.DataFrame(np.repeat(jackpot_faces[:, None], len(die_totals), axis = 1),\
+                                      index = self.__roll_index()[is_jackpot])
+            jackpot_df.columns.name = 'die_number'
+        else:
+            jackpot_df = pd.DataFrame(self.__decode(self.__codes[is_jackpot]),\
+                                      index = self.__roll_index()[is_jackpot])
+            jackpot_df.columns.name = 'die_number'
+        jackpot_df.index.name = 'roll_number'
+        return jackpot_df, int(is_jackpot.sum())
+    
+    def comp_jackpot_prob(self):
+        """
+        PURPOSE: Estimates the probability of a jackpot on a single roll. Without weights this is the share of rolls that were jackpots; with weights it is the weighted share, which is unbiased under importance sampling.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        the estimated probability of a jackpot (float)
+        """
+        return self.__cached('jackpot_prob', self.__jackpot_prob)
+    
+    def __jackpot_prob(self):
+        """
+        PURPOSE: Computes the (weighted) share of jackpot rolls, for comp_jackpot_prob.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        the estimated probability of a jackpot (float)
+        """
+        is_jackpot = self.__jackpot_mask()
+        if self.weights is None:
+            return float(is_jackpot.mean())
+        return float(self.weights[is_jackpot].sum() / len(is_jackpot))
+    
+    def __count_frame(self, count):
+        """
+        PURPOSE: Counts the distinct rows of the face codes into the dataframe layout of combo_df, with a column 'n' of counts and, when the analyzer has weights, a column 'p' of estimated probabilities.
+        
+        INPUT:
+        count    the counting function to apply to the face codes, _count_combos or _count_rows
         
         OUTPUT:
-        results    a list of the outcomes of the die rolls
+        a dataframe indexed by the distinct rows
         """
-        results = []
+        pd = _pandas()
+        faces = self.__faces
+        codes = self.__codes
+        if self.__histogram is not None:
+            if count is not _count_combos:
+                raise ValueError('Histogram results do not keep the order of the dice')
+            rows, counts = self.__rank_rows(_count_histogram_combos(self.__histogram, len(faces)), True)
+            data = {'n': counts.astype(np.int64)}
+        elif self.weights is None:
+            rows, counts = self.__rank_rows(count(codes, len(faces)), count is _count_combos)
+            data = {'n': counts.astype(np.int64)}
+        else:
+            rows, counts, sums = self.__rank_rows(count(codes, len(faces), self.weights),\
+                                                  count is _count_combos)
+            data = {'n': counts.astype(np.int64), 'p': sums / len(codes)}
+        index = pd.MultiIndex.from_arrays([faces[rows[:, j]] for j in range(rows.shape[1])],\
+                                          names = list(range(rows.shape[1])))
+        return pd.DataFrame(data, index = index)
+        
+    def comp_combo(self):
+        """
+        PURPOSE: Computes the distinct combinations of faces rolled, along with their counts. Each roll gets a key from the number of times it shows each face, so the rolls never need sorting, and the keys are counted in one pass; for histogram results the keys are summed from the histograms. With weights, the estimated probability of each combination is added as column 'p'.
         
-        for i in range(num_rolls):
-            result = self.__diedf.reset_index()['side']\
-            .sample(weights=self.__diedf.reset_index()['weight'])\
-            .values[0]
-            results.append(result)
+        INPUT:
+        none
+        
+        OUTPUT:
+        none - results are stored as combo_df (dataframe)
+        """
+        self.combo_df = self.__cached('combo_df', lambda: self.__count_frame(_count_combos))
             
-        return results
+    def count_faces_per_roll(self):
+        """
+        PURPOSE: Compute how many times a given face is rolled in each event/roll. The counts come from a row-wise bincount of the face codes, and only faces that were rolled at least once get a column. For histogram results, which are mostly zeros when dense, val_counts_df is instead in long form: one row per roll and face rolled in it, indexed by (roll_number, face), with the count in column 'n'.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        none - results are stored as val_counts_df (dataframe)
+        """
+        self.val_counts_df = self.__cached('val_counts_df', self.__face_count_frame)
     
-    def show_die(self):
+    def __face_count_frame(self):
         """
-        PURPOSE: Show the user the die's current set of faces/weights.
+        PURPOSE: Counts the faces of each roll into the dataframe layout of val_counts_df, for count_faces_per_roll.
         
         INPUT:
         none
         
         OUTPUT:
-        the dataframe of the die created in the initializer
+        a dataframe with one row per roll and one column per face rolled, or the long form for histogram results
         """
-        return self.__diedf
+        pd = _pandas()
+        if self.__histogram is not None:
+            indptr, indices, data, die_totals = self.__histogram
+            index = pd.MultiIndex.from_arrays([np.repeat(np.arange(self.__num_rolls), np.diff(indptr)),\
+                                               self.__decode(indices)], names = ['roll_number', 'face'])
+            return pd.DataFrame({'n': data.astype(np.int64)}, index = index)
+        counts = _count_faces(self.__codes, len(self.__faces))
+        if self.__rank is not None:
+            counts = counts[:, np.argsort(self.__rank)]
+        rolled = counts.any(axis = 0)
+        return pd.DataFrame(counts[:, rolled].astype(float),\
+                            index = self.__roll_index(),\
+                            columns = self.__faces[rolled])
+        
+    def comp_permutation(self):
+        """
+        PURPOSE: Computes the distinct permutations of faces rolled, where the order of the dice matters, along with their counts. Each roll is packed into a single integer key (or its raw bytes when the key would not fit in 64 bits) and the keys are counted in one pass. With weights, the estimated probability of each permutation is added as column 'p'. Histogram results do not keep the order of the dice, so they raise a ValueError.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        none - results are stored as perm_df (dataframe)
+        """
+        self.perm_df = self.__cached('perm_df', lambda: self.__count_frame(_count_rows))
+        
+        
+@functools.lru_cache(maxsize = ANALYZER_CACHE_SIZE)
+def analyzer_for(game):
+    """
+    PURPOSE: Gives the shared Analyzer of a game, so that statistics asked for again on the same results are not recomputed. The analyzers of the ANALYZER_CACHE_SIZE most recently used games are kept; older ones are dropped along with their cached statistics. Use analyzer_for.cache_clear() to drop them all.
     
+    INPUT:
+    game    a Game object
     
-class Game:
+    OUTPUT:
+    the Analyzer of the game, which follows the game when it is played again
     """
-    PURPOSE: This class plays the dice game by rolling one or more of the same kind of dice one or more times. Note that each die in a given game will have the same number of sides and associated faces, but each die may have its own weights. This class keeps the results of the most recent play.
+    return Analyzer(game)
+    
+    
+def _sweep_block(faces, weights, points, seeds, bit_generator = 'PCG64'):
+    """
+    PURPOSE: Plays and analyzes the games of one die configuration in a parameter sweep. One die is built for the configuration, so its sampling tables are built once and shared by every game, and each game rolls all of its dice in a single batch. The statistics are counted on the arrays of face codes, without dataframes. It lives at module level so that process pools can pickle it.
     
     INPUT:
-    die_lst    a list of die objects
+    faces           the faces of the die (array)
+    weights         the weights of the die (array)
+    points          the (num_dice, num_rolls) games to play (list)
+    seeds           one numpy SeedSequence per game (list)
+    bit_generator   name of the numpy bit generator - defaults to "PCG64" (str)
     
     OUTPUT:
-    depends on the method applied
+    a list with one dict of statistics per game
+    """
+    die = Die(faces)
+    die.change_weights(weights)
+    sorted_faces, rank = _sort_faces(die.faces)
+    rows = []
+    for (num_dice, num_rolls), seed_seq in zip(points, seeds):
+        codes = _roll_codes([[die, None, list(range(num_dice))]], num_dice, len(faces), num_rolls,\
+                            make_rng(seed_seq, bit_generator))
+        if rank is not None:
+            codes = rank[codes]
+        jackpots = int(np.count_nonzero(_jackpot_mask(codes)))
+        combos, counts = _count_combos(codes, len(faces))
+        rows.append({'num_dice': num_dice, 'num_rolls': num_rolls, 'jackpots': jackpots,\
+                     'jackpot_prob': jackpots / num_rolls if num_rolls else 0.0, 'combos': len(counts),\
+                     'top_combo': tuple(sorted_faces[combos[0]].tolist()) if len(counts) else None,\
+                     'top_combo_n': int(counts[0]) if len(counts) else 0})
+    return rows
+
+def sweep(faces, weights, num_dice, num_rolls, workers = 1, seed = None, executor = None,\
+          bit_generator = 'PCG64'):
     """
+    PURPOSE: Plays and analyzes a grid of games that differ only in the weights of their dice, the number of dice and the number of rolls, and sums them up in one table. Every game of the grid rolls identical dice. Games with the same weights share one die and its sampling tables, and are handed to the same worker; the work is spread over a process pool when workers is more than 1.
     
-    def __init__(self, die_lst):
+    Each game gets its own child of the seed's SeedSequence in grid order, so a sweep is reproduced by the same seed whatever the number of workers.
+    
+    INPUT:
+    faces           the faces of the dice (array)
+    weights         the weight configurations to try - a list of weight arrays, or a dict from a label to a weight array
+    num_dice        the numbers of dice to try (list of int)
+    num_rolls       the numbers of rolls to try (list of int)
+    workers         optional number of processes - defaults to 1 (int)
+    seed            optional int, SeedSequence or numpy Generator for the rolls
+    executor        optional concurrent.futures executor to run the work on - defaults to a new ProcessPoolExecutor when workers is more than 1
+    bit_generator   name of the numpy bit generator - defaults to "PCG64" (str)
+    
+    OUTPUT:
+    a dataframe with one row per game: the label of the weights ('config'), num_dice, num_rolls, the number of jackpots, the jackpot probability, the number of distinct combinations, and the most common combination with its count
+    """
+    pd = _pandas()
+    if workers < 1:
+        raise ValueError('The number of workers must be at least 1')
+    faces = np.asarray(faces)
+    if not isinstance(weights, dict):
+        weights = dict(enumerate(weights))
+    points = [(m, n) for m in num_dice for n in num_rolls]
+    seeds = iter(_seed_sequence(seed).spawn(len(weights) * len(points)))
+    
+    tasks = {}
+    for label, config in weights.items():
+        config = np.asarray(config, dtype = float)
+        if config.shape != faces.shape:
+            raise ValueError('Every weight configuration must have one weight per face')
+        task = tasks.setdefault(config.tobytes(), [config, [], [], []])
+        for point in points:
+            task[1].append(label)
+            task[2].append(point)
+            task[3].append(next(seeds))
+    
+    blocks = []
+    parts = max(1, workers // len(tasks)) if tasks else 1
+    for config, labels, task_points, task_seeds in tasks.values():
+        for i in range(parts):
+            if labels[i::parts]:
+                blocks.append((config, labels[i::parts], task_points[i::parts], task_seeds[i::parts]))
+    
+    if workers == 1:
+        results = [_sweep_block(faces, config, block_points, block_seeds, bit_generator)\
+                   for config, labels, block_points, block_seeds in blocks]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        pool = executor if executor is not None else ProcessPoolExecutor(max_workers = workers)
+        try:
+            results = list(pool.map(_sweep_block, [faces] * len(blocks), [block[0] for block in blocks],\
+                                    [block[2] for block in blocks], [block[3] for block in blocks],\
+                                    [bit_generator] * len(blocks)))
+        finally:
+            if executor is None:
+                pool.shutdown()
+    
+    order = {(label, point): i for i, (label, point) in\
+             enumerate((label, point) for label in weights for point in points)}
+    rows = []
+    for (config, labels, block_points, block_seeds), block_rows in zip(blocks, results):
+        for label, row in zip(labels, block_rows):
+            rows.append(dict(config = label, **row))
+    rows.sort(key = lambda row: order[(row['config'], (row['num_dice'], row['num_rolls']))])
+    return pd.DataFrame(rows, columns = ['config', 'num_dice', 'num_rolls', 'jackpots', 'jackpot_prob',\
+                                         'combos', 'top_combo', 'top_combo_n'])
+    
+    
+class StreamAnalyzer:
+    """
+    PURPOSE: This class keeps running statistics over a game that is played in chunks (see Game.play_chunks), so that memory use stays bounded however many rolls are made. Partial results from separate runs can be merged.
+    
+    INPUT:
+    faces    the face table the chunks refer to, e.g. game.faces (array)
+    
+    OUTPUT:
+    depends on method applied
+    """
+    def __init__(self, faces):
         """
-        PURPOSE: Initializes a game.
+        PURPOSE: Initializes the stream analyzer with no rolls seen.
         
         INPUT:
-        die_lst    a list of die objects
+        faces    the face table the chunks refer to, e.g. game.faces (array)
         
         OUTPUT:
         none
         """
-        self.die_lst = die_lst
+        self.faces, self.__rank = _sort_faces(np.asarray(faces))
+        self.num_rolls = 0
+        self.jackpots = 0
+        self.face_counts = np.zeros(len(self.faces), dtype = np.int64)
+        self.__combo_rows = None
+        self.__combo_counts = None
         
-    def play(self, num_rolls):
+    def update(self, codes):
         """
-        PURPOSE: Rolls the dice however many times are specified in num_rolls and saves the results of the game to a private dataframe. 
+        PURPOSE: Adds one chunk of rolls to the running jackpot count, combo counts and face-count totals.
         
         INPUT:
-        num_rolls    number of rolls for the group of dice (int)
+        codes    matrix of face codes with one row per roll and one column per die (array)
         
         OUTPUT:
-        none - saves the results to a private dataframe
+        none
         """
-        results = []
-        for die in self.die_lst:
-            die_rolls = []
-            for i in range(num_rolls):
-                result = die.show_die()\
-                .reset_index()['side']\
-                .sample(weights=die.show_die()\
-                        .reset_index()['weight'])\
-                .values[0]
-                
-                die_rolls.append(result)
-            results.append(die_rolls)
-    
-        self.__play_df = pd.DataFrame(results)
-        self.__play_df.index.name = 'die_number'
-        self.__play_df.T.index.name = 'roll_number'
+        codes = np.asarray(codes)
+        if self.__rank is not None:
+            codes = self.__rank[codes]
+        num_faces = len(self.faces)
+        
+        with _phase('analyze', codes.size):
+            self.num_rolls += len(codes)
+            self.jackpots += int(np.count_nonzero(_jackpot_mask(codes)))
+            self.face_counts += np.bincount(codes.ravel(), minlength = num_faces)
+            rows, counts = _count_combos(codes, num_faces)
+            self.__add_combos(rows, counts)
+        
+    def __add_combos(self, rows, counts):
+        """
+        PURPOSE: Merges partial combo counts into the running combo counts.
+        
+        INPUT:
+        rows     distinct sorted rows of face codes (array)
+        counts   the count of each row (array)
+        
+        OUTPUT:
+        none
+        """
+        if self.__combo_rows is not None:
+            rows = np.concatenate([self.__combo_rows, rows.astype(self.__combo_rows.dtype)])
+            counts = np.concatenate([self.__combo_counts, counts])
+        self.__combo_rows, self.__combo_counts = _merge_rows(rows, counts, len(self.faces))
+        
+    def merge(self, other):
+        """
+        PURPOSE: Adds the statistics of another stream analyzer over the same faces into this one, e.g. to combine chunks analyzed by separate workers.
+        
+        INPUT:
+        other    a StreamAnalyzer over the same faces
+        
+        OUTPUT:
+        none
+        """
+        if not np.array_equal(self.faces, other.faces):
+            raise ValueError('Only stream analyzers over the same faces can be merged')
+        self.num_rolls += other.num_rolls
+        self.jackpots += other.jackpots
+        self.face_counts += other.face_counts
+        if other.__combo_rows is not None:
+            self.__add_combos(other.__combo_rows, other.__combo_counts)
+        
+    def comp_jackpot(self):
+        """
+        PURPOSE: Gives the number of jackpots seen so far.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        the number of rolls in which every die showed the same face (int)
+        """
+        return self.jackpots
     
-    def show_results(self, df_form = 'wide'):
+    def comp_combo(self):
         """
-        PURPOSE: Shows the user the results of the most recent play in the game by passing the dataframe to the user in a specified format.
+        PURPOSE: Builds the combo counts seen so far in the same layout as Analyzer.comp_combo.
         
         INPUT:
-        df_form    optional argument that takes the form "wide" or "narrow" for the dataframe
+        none
         
         OUTPUT:
-        either the narrow or wide form of the private dataframe containing play results
+        none - results are stored as combo_df (dataframe)
         """
-        if df_form == 'narrow':
-            narrow_df = pd.DataFrame(self.__play_df.stack()).rename(columns={0:'face_rolled'})
-            return narrow_df
-        elif df_form == 'wide':
-            return self.__play_df.T
-        else:
-            raise Exception("Form must be set to either 'wide' or 'narrow'")
-            
-
-class Analyzer:
+        pd = _pandas()
+        if self.__combo_rows is None:
+            raise Exception('No rolls have been added to the stream analyzer yet')
+        rows = self.__combo_rows
+        index = pd.MultiIndex.from_arrays([self.faces[rows[:, j]] for j in range(rows.shape[1])],\
+                                          names = list(range(rows.shape[1])))
+        self.combo_df = pd.DataFrame({'n': self.__combo_counts}, index = index)
+        
+    def count_faces(self):
+        """
+        PURPOSE: Builds the total number of times each face was rolled, over every die and every roll seen so far.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        none - results are stored as face_counts_df (dataframe)
+        """
+        pd = _pandas()
+        self.face_counts_df = pd.DataFrame({'n': self.face_counts}, index = self.faces)
+        self.face_counts_df.index.name = 'face'
+        
+        
+class ExactAnalyzer:
     """
-    PURPOSE: This class takes the results of a single game and computes various descriptive statistical properties about it. 
+    PURPOSE: This class computes the same statistics as the Analyzer class exactly from the weights of a game's dice, without playing it. Jackpot probability and expected face counts are closed form; combo probabilities come from a convolution over the dice, which is memoized per weight configuration and limited to games with at most max_states combinations.
     
     INPUT:
-    game_results    a Game object with shown results (wide or narrow) as the input (dataframe)
+    game         a Game object (it does not need to have been played)
+    max_states   optional largest number of combinations to enumerate - defaults to 10 ** 6 (int)
     
     OUTPUT:
     depends on method applied
     """
-    def __init__(self, game_results):
+    def __init__(self, game, max_states = 10 ** 6):
         """
-        PURPOSE: Initializes the analyzer.
+        PURPOSE: Initializes the exact analyzer from the current weights of the game's dice.
         
         INPUT:
-        game_results   a Game object with shown results (wide or narrow) as the input (dataframe)
+        game         a Game object
+        max_states   optional largest number of combinations to enumerate - defaults to 10 ** 6 (int)
         
         OUTPUT:
         none
         """
-        self.game_results = game_results
+        faces, probs = game._face_probabilities()
+        self.faces, rank = _sort_faces(faces)
+        if rank is not None:
+            sorted_probs = np.empty_like(probs)
+            sorted_probs[:, rank] = probs
+            probs = sorted_probs
+        self.probs = probs
+        self.max_states = max_states
     
     def comp_jackpot(self):
         """
-        PURPOSE: Computes how many times the game resulted in all faces of the dice being identical, or in other words, the "jackpot."
+        PURPOSE: Computes the probability that a roll is a jackpot, which is the sum over the faces of the product of every die's probability of that face.
         
         INPUT:
         none
         
         OUTPUT:
-        the number of times the game had a jackpot (int)
+        the probability of a jackpot on a single roll (float)
         """
-        if len(self.game_results.columns) == 1:
-            game_unstacked = self.game_results.unstack(level = 0)
-            jackpots = 0
-            self.jackpot_df = pd.DataFrame([])
-    
-            for i in range(len(game_unstacked)):
-                arr = game_unstacked.loc[i, :]
-                if np.all(arr == arr[0]) == True:
-                    jackpots += 1
-                    for j in range(len(game_unstacked.columns)):
-                        self.jackpot_df.loc[i, j] = arr[0]
-                else:
-                    continue
-            self.jackpot_df.index.name = 'roll_number'
-            return jackpots
-        else:
-            jackpots = 0
-            self.jackpot_df = pd.DataFrame([])
-    
-            for i in range(len(self.game_results)):
-                arr = self.game_results.loc[i, :]
-                if np.all(arr == arr[0]) == True:
-                    jackpots += 1
-                    for j in range(len(self.game_results.columns)):
-                        self.jackpot_df.loc[i, j] = arr[0]
-                else:
-                    continue
-            self.jackpot_df.index.name = 'roll_number'
-            return jackpots
-        
+        return float(np.prod(self.probs, axis = 0).sum())
+    
     def comp_combo(self):
         """
-        PURPOSE: Computes the distinct combinations of faces rolled, along with their counts.
+        PURPOSE: Computes the exact probability of every distinct combination of faces.
         
         INPUT:
         none
         
         OUTPUT:
-        none - results are stored as combo_df (dataframe)
+        none - results are stored as combo_df (dataframe) in the layout of Analyzer.comp_combo, with a column 'p' of probabilities
         """
-        # narrow df
-        if len(self.game_results.columns) == 1:
-            self.combo_df = self.game_results.unstack(level = 0).apply(lambda x:\
-                                                                       pd.Series(sorted(x)),\
-                                                                       1).\
-            value_counts().to_frame('n')
-
-            
-        else: # if the game is provided as a wide df
-            self.combo_df = self.game_results.apply(lambda x:\
-                                                    pd.Series(sorted(x)),\
-                                                    1).value_counts().to_frame('n')
-            
+        pd = _pandas()
+        num_dice, num_faces = self.probs.shape
+        if math.comb(num_dice + num_faces - 1, num_dice) > self.max_states:
+            raise ValueError('The game has too many combinations to enumerate exactly - play it instead')
+        rows, probs = _exact_combos(self.probs.tobytes(), num_dice, num_faces)
+        
+        index = pd.MultiIndex.from_arrays([self.faces[rows[:, j]] for j in range(num_dice)],\
+                                          names = list(range(num_dice)))
+        self.combo_df = pd.DataFrame({'p': probs}, index = index)
+    
     def count_faces_per_roll(self):
         """
-        PURPOSE: Compute how many times a given face is rolled in each event/roll.
+        PURPOSE: Computes the expected number of times each face is rolled in a single roll of the dice.
         
         INPUT:
         none
         
         OUTPUT:
-        none - results are stored as val_counts_df (dataframe)
+        none - results are stored as val_counts_df (dataframe) with one row, 'expected', and one column per face
         """
-        # narrow df
-        if len(self.game_results.columns) == 1:
-            game_unstacked = self.game_results.unstack(level = 0)
-            
-            self.val_counts_df = game_unstacked.apply(pd.Series.value_counts,\
-                                                      axis = 1).fillna(0)
-                
-        # wide df
-        else:
-            self.val_counts_df = self.game_results.apply(pd.Series.value_counts,\
-                                                         axis = 1).fillna(0)
-        
-
-
+        pd = _pandas()
+        self.val_counts_df = pd.DataFrame([self.probs.sum(axis = 0)], index = ['expected'],\
+                                          columns = self.faces)
@@ -0,0 +1,376 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+import numpy as np
+from montecarlo.montecarlo import Die, Game, Analyzer, BIT_GENERATORS, _pick_strategy
+
+# Grid of the benchmark suite. Cases whose results would hold more than
+# MAX_CELLS values are skipped.
+FACE_COUNTS = (2, 6, 100, 10 ** 4)
+DICE_COUNTS = (1, 10, 100)
+ROLL_COUNTS = (10 ** 2, 10 ** 4, 10 ** 6, 10 ** 7)
+MAX_CELLS = 10 ** 8
+
+def best_time(func, repeat = 5):
+    """
+    PURPOSE: Times a function several times and keeps the fastest run, which is the least disturbed by other work on the machine.
+
+    INPUT:
+    func     a function that takes no arguments
+    repeat   the number of times to run the function - defaults to 5 (int)
+
+    OUTPUT:
+    the fastest run time in seconds (float)
+    """
+    times = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def measure(func, setup = None, repeat = 3):
+    """
+    PURPOSE: Measures the fastest run time of a function and the peak memory it allocates. The peak is taken with tracemalloc (which numpy reports its arrays to) on one extra run, so tracing does not slow down the timed runs.
+
+    INPUT:
+    func     a function that takes no arguments
+    setup    optional function run before every run of func, outside the measurement
+    repeat   the number of timed runs - defaults to 3 (int)
+
+    OUTPUT:
+    elapsed   the fastest run time in seconds (float)
+    peak      the peak number of bytes allocated during a run (int)
+    """
+    times = []
+    for i in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return min(times), peak
+
+def cases(max_cells = MAX_CELLS, face_counts = FACE_COUNTS, dice_counts = DICE_COUNTS,
+          roll_counts = ROLL_COUNTS):
+    """
+    PURPOSE: Lists the (faces, dice, rolls) cases of the benchmark suite that fit within max_cells results.
+
+    INPUT:
+    max_cells     the largest number of rolls times dice to try - defaults to MAX_CELLS (int)
+    face_counts   the numbers of faces to try (tuple of int)
+    dice_counts   the numbers of dice to try (tuple of int)
+    roll_counts   the numbers of rolls to try (tuple of int)
+
+    OUTPUT:
+    a list of (faces, dice, rolls) tuples
+    """
+    return [(k, m, n) for k in face_counts for m in dice_counts for n in roll_counts
+            if m * n <= max_cells]
+
+def record(results, bench, variant, k, m, n, elapsed, peak):
+    """
+    PURPOSE: Adds one measurement to the results of the suite and prints it as a line of the suite's table.
+
+    INPUT:
+    results   the list of results so far, or None to only print (list)
+    bench     the name of the benchmark (str)
+    variant   the method, form or strategy that was measured (str)
+    k, m, n   the numbers of faces, dice and rolls (int)
+    elapsed   the run time in seconds (float)
+    peak      the peak bytes allocated (int)
+
+    OUTPUT:
+    none
+    """
+    print('%-14s %-22s %6d %4d %9d %10.4f %12.0f %9.1f' %
+          (bench, variant, k, m, n, elapsed, m * n / elapsed, peak / 2 ** 20))
+    if results is not None:
+        results.append({'bench': bench, 'variant': variant, 'faces': k, 'dice': m, 'rolls': n,
+                        'time': elapsed, 'peak': peak})
+
+def weighted_die(k, seed = 0):
+    """
+    PURPOSE: Makes a die with k faces and random weights, which is the general case for sampling.
+
+    INPUT:
+    k      the number of faces (int)
+    seed   the seed of the weights - defaults to 0 (int)
+
+    OUTPUT:
+    a Die object
+    """
+    die = Die(np.arange(k))
+    die.change_weights(np.random.default_rng(seed).random(k) + 0.1)
+    return die
+
+def bench_roll_die(results = None, max_cells = MAX_CELLS):
+    """
+    PURPOSE: Measures Die.roll_die with each sampling strategy over the face and roll counts of the suite.
+
+    INPUT:
+    results     optional list to add the measurements to (list)
+    max_cells   the largest number of rolls to try - defaults to MAX_CELLS (int)
+
+    OUTPUT:
+    none - prints one line per case
+    """
+    for k, m, n in cases(max_cells, dice_counts = (1,)):
+        die = weighted_die(k)
+        for strategy in ('cdf', 'alias', 'auto'):
+            die.roll_die(1, strategy = strategy)
+            elapsed, peak = measure(lambda: die.roll_die(n, strategy = strategy, as_list = True))
+            record(results, 'roll_die', strategy, k, m, n, elapsed, peak)
+
+def bench_play(results = None, max_cells = MAX_CELLS, samplings = ('plain', 'stratified', 'antithetic')):
+    """
+    PURPOSE: Measures Game.play with each sampling mode over the grid of the suite.
+
+    INPUT:
+    results     optional list to add the measurements to (list)
+    max_cells   the largest number of rolls times dice to try - defaults to MAX_CELLS (int)
+    samplings   the sampling modes to compare (tuple of str)
+
+    OUTPUT:
+    none - prints one line per case
+    """
+    for k, m, n in cases(max_cells):
+        game = Game([weighted_die(k)] * m)
+        for sampling in samplings:
+            elapsed, peak = measure(lambda: game.play(n, seed = 0, sampling = sampling),
+                                    repeat = 3 if m * n <= 10 ** 6 else 1)
+            record(results, 'play', sampling, k, m, n, elapsed, peak)
+
+def bench_show_results(results = None, max_cells = MAX_CELLS):
+    """
+    PURPOSE: Measures Game.show_results in wide and narrow form over the grid of the suite. The game is played again before every run so that the cached dataframe is not reused.
+
+    INPUT:
+    results     optional list to add the measurements to (list)
+    max_cells   the largest number of rolls times dice to try - defaults to MAX_CELLS (int)
+
+    OUTPUT:
+    none - prints one line per case
+    """
+    for k, m, n in cases(max_cells):
+        game = Game([weighted_die(k)] * m)
+        for form in ('wide', 'narrow'):
+            elapsed, peak = measure(lambda: game.show_results(form), lambda: game.play(n, seed = 0),
+                                    repeat = 3 if m * n <= 10 ** 6 else 1)
+            record(results, 'show_results', form, k, m, n, elapsed, peak)
+
+def bench_analyzer(results = None, max_cells = MAX_CELLS,
+                   methods = ('comp_jackpot', 'comp_combo', 'comp_permutation', 'count_faces_per_roll')):
+    """
+    PURPOSE: Measures each Analyzer method over the grid of the suite. Every run uses a new Analyzer, so memoized statistics are not reused. count_faces_per_roll is skipped when its rolls-by-faces result would exceed max_cells.
+
+    INPUT:
+    results     optional list to add the measurements to (list)
+    max_cells   the largest number of rolls times dice to try - defaults to MAX_CELLS (int)
+    methods     the Analyzer methods to measure (tuple of str)
+
+    OUTPUT:
+    none - prints one line per case
+    """
+    for k, m, n in cases(max_cells):
+        game = Game([weighted_die(k)] * m)
+        game.play(n, seed = 0)
+        for method in methods:
+            if method == 'count_faces_per_roll' and k * n > max_cells:
+                continue
+            elapsed, peak = measure(lambda: getattr(Analyzer(game), method)(),
+                                    repeat = 3 if m * n <= 10 ** 6 else 1)
+            record(results, 'analyzer', method, k, m, n, elapsed, peak)
+
+def compare(results, baseline, tolerance = 1.25):
+    """
+    PURPOSE: Compares the results of the suite with a saved baseline run and lists the cases that got slower or used more memory by more than the tolerance.
+
+    INPUT:
+    results     the results of this run (list)
+    baseline    the results of an earlier run, as saved with --save (list)
+    tolerance   the ratio over the baseline that counts as a regression - defaults to 1.25 (float)
+
+    OUTPUT:
+    the number of regressions found (int)
+    """
+    key = lambda r: (r['bench'], r['variant'], r['faces'], r['dice'], r['rolls'])
+    before = {key(r): r for r in baseline}
+    regressions = 0
+    for r in results:
+        old = before.get(key(r))
+        if old is None:
+            continue
+        for field in ('time', 'peak'):
+            if old[field] > 0 and r[field] / old[field] > tolerance:
+                regressions += 1
+                print('REGRESSION %s %s faces=%d dice=%d rolls=%d: %s %.4g -> %.4g' %
+                      (r['bench'], r['variant'], r['faces'], r['dice'], r['rolls'],
+                       field, old[field], r[field]))
+    return regressions
+
+def bench_strategies(face_counts = (2, 16, 256, 4096, 65536),
+                     roll_counts = (10, 1000, 100000)):
+    """
+    PURPOSE: Compares the "cdf" and "alias" sampling strategies of Die.roll_die over a grid of face counts and batch sizes, and shows which one "auto" picks. The sampling tables are built before timing starts, so only the per-draw cost is measured.
+
+    INPUT:
+    face_counts   the numbers of faces to try (tuple of int)
+    roll_counts   the batch sizes to try (tuple of int)
+
+    OUTPUT:
+    none - prints one line per case
+    """
+    print('%8s %8s %12s %12s %8s %8s' % ('faces', 'rolls', 'cdf (us)', 'alias (us)', 'winner', 'auto'))
+    rng = np.random.default_rng(0)
+    for k in face_counts:
+        die = Die(np.arange(k))
+        for face, weight in enumerate(rng.random(k)):
+            die.change_weight(face, float(weight))
+        die.roll_die(1, strategy = 'cdf')
+        die.roll_die(1, strategy = 'alias')
+        for n in roll_counts:
+            cdf = best_time(lambda: die.roll_die(n, strategy = 'cdf'))
+            alias = best_time(lambda: die.roll_die(n, strategy = 'alias'))
+            winner = 'alias' if alias < cdf else 'cdf'
+            auto = _pick_strategy(k, n)
+            print('%8d %8d %12.1f %12.1f %8s %8s' % (k, n, cdf * 1e6, alias * 1e6, winner, auto))
+
+def bench_reweight(face_counts = (6, 100, 10000), changes = 100, num_rolls = 100):
+    """
+    PURPOSE: Times one re-weight-then-roll cycle of a die, changing many weights at once with change_weights and a single weight with change_weight.
+
+    INPUT:
+    face_counts   the numbers of faces to try (tuple of int)
+    changes       the number of weights changed by change_weights - defaults to 100 (int)
+    num_rolls     the number of rolls after each change - defaults to 100 (int)
+
+    OUTPUT:
+    none - prints one line per face count
+    """
+    print('%8s %18s %18s' % ('faces', 'bulk cycle (us)', 'single cycle (us)'))
+    rng = np.random.default_rng(0)
+    for k in face_counts:
+        die = Die(np.arange(k))
+        picks = rng.choice(k, min(changes, k), replace = False).tolist()
+        mapping = dict(zip(picks, (rng.random(len(picks)) + 0.5).tolist()))
+        def bulk():
+            die.change_weights(mapping)
+            die.roll_die(num_rolls)
+        def single():
+            die.change_weight(picks[0], 2.0)
+            die.roll_die(num_rolls)
+        print('%8d %18.1f %18.1f' % (k, best_time(bulk, 50) * 1e6, best_time(single, 50) * 1e6))
+
+def bench_parallel(num_rolls = 10 ** 7, num_dice = 10, max_workers = None):
+    """
+    PURPOSE: Shows how Game.play scales from 1 to N worker processes on a fixed game, along with the speedup over a single worker.
+
+    INPUT:
+    num_rolls     the number of rolls in the game - defaults to 10 ** 7 (int)
+    num_dice      the number of dice in the game - defaults to 10 (int)
+    max_workers   the largest number of workers to try - defaults to the number of cores (int)
+
+    OUTPUT:
+    none - prints one line per number of workers
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    game = Game([Die(np.arange(6)) for i in range(num_dice)])
+    print('%8s %12s %10s' % ('workers', 'time (s)', 'speedup'))
+    base = None
+    for workers in range(1, max_workers + 1):
+        elapsed = best_time(lambda: game.play(num_rolls, workers = workers, seed = 0), repeat = 3)
+        base = elapsed if base is None else base
+        print('%8d %12.3f %10.2f' % (workers, elapsed, base / elapsed))
+
+def bench_bit_generators(num_rolls = 10 ** 6, num_dice = 10):
+    """
+    PURPOSE: Compares the throughput of the numpy bit generators that Game.play can draw from on a fixed seeded game.
+
+    INPUT:
+    num_rolls   the number of rolls in the game - defaults to 10 ** 6 (int)
+    num_dice    the number of dice in the game - defaults to 10 (int)
+
+    OUTPUT:
+    none - prints one line per bit generator
+    """
+    game = Game([Die(np.arange(6)) for i in range(num_dice)])
+    print('%10s %12s %16s' % ('generator', 'time (s)', 'rolls per sec'))
+    for name in BIT_GENERATORS:
+        elapsed = best_time(lambda: game.play(num_rolls, seed = 0, bit_generator = name), repeat = 3)
+        print('%10s %12.3f %16.0f' % (name, elapsed, num_rolls * num_dice / elapsed))
+
+def bench_import(repeat = 5):
+    """
+    PURPOSE: Times a cold import of the montecarlo package in a new interpreter, next to the imports of numpy and pandas alone, to keep start-up of short jobs and worker processes fast. Interpreter start-up is included in every time.
+
+    INPUT:
+    repeat   the number of interpreters started per import - defaults to 5 (int)
+
+    OUTPUT:
+    none - prints one line per import
+    """
+    print('%-40s %12s' % ('import', 'time (ms)'))
+    for statement in ('pass', 'import numpy', 'import pandas', 'import montecarlo.montecarlo',
+                      'import montecarlo.montecarlo, pandas'):
+        elapsed = best_time(lambda: subprocess.run([sys.executable, '-c', statement], check = True), repeat)
+        print('%-40s %12.1f' % (statement, elapsed * 1e3))
+
+def run_suite(max_cells = MAX_CELLS):
+    """
+    PURPOSE: Runs the benchmark suite over Die.roll_die, Game.play, Game.show_results and the Analyzer methods.
+
+    INPUT:
+    max_cells   the largest number of rolls times dice to try - defaults to MAX_CELLS (int)
+
+    OUTPUT:
+    the list of measurements, one dict per case (list)
+    """
+    results = []
+    print('%-14s %-22s %6s %4s %9s %10s %12s %9s' %
+          ('bench', 'variant', 'faces', 'dice', 'rolls', 'time (s)', 'cells/sec', 'peak MiB'))
+    bench_roll_die(results, max_cells)
+    bench_play(results, max_cells)
+    bench_show_results(results, max_cells)
+    bench_analyzer(results, max_cells)
+    return results
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Benchmarks of the montecarlo package.')
+    parser.add_argument('--max-cells', type = int, default = MAX_CELLS,
+                        help = 'skip cases with more rolls times dice than this')
+    parser.add_argument('--save', help = 'write the suite results to this JSON file')
+    parser.add_argument('--baseline', help = 'compare the suite results with this JSON file')
+    parser.add_argument('--tolerance', type = float, default = 1.25,
+                        help = 'ratio over the baseline that counts as a regression')
+    parser.add_argument('--extras', action = 'store_true',
+                        help = 'also run the strategy, reweight, parallel, bit generator and import benchmarks')
+    args = parser.parse_args()
+    
+    results = run_suite(args.max_cells)
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent = 1)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        print('%d regressions' % regressions)
+    if args.extras:
+        bench_strategies()
+        bench_reweight()
+        bench_parallel()
+        bench_bit_generators()
+        bench_import()
@@ -1,7 +1,16 @@
 import pandas as pd
 import numpy as np
+import asyncio
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
 import unittest
-from montecarlo.montecarlo import Die
+from montecarlo.montecarlo import Die, make_rng, BIT_GENERATORS
 
 class DieTestSuite(unittest.TestCase):
     """
@@ -89,9 +98,235 @@ class DieTestSuite(unittest.TestCase):
         actual = all(x == 1 for x in actual_lst)
         expected = True
         self.assertEqual(actual, expected)
+    
+    def test_5_roll_die_array(self):
+        """
+        PURPOSE: Tests that 'roll_die' returns a numpy array by default and a list when as_list is set, both containing only faces of the die.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        none
+        """
+        die5 = Die(np.array(['a', 'b', 'c']))
+        
+        rolls = die5.roll_die(100)
+        rolls_lst = die5.roll_die(100, as_list = True)
+        
+        actual = isinstance(rolls, np.ndarray) and isinstance(rolls_lst, list)\
+        and set(rolls) <= {'a', 'b', 'c'} and set(rolls_lst) <= {'a', 'b', 'c'}
+        expected = True
+        self.assertEqual(actual, expected)
+        
+    def test_6_roll_die_zero_weight(self):
+        """
+        PURPOSE: Tests that a face whose weight is changed to 0 is never rolled, which checks that the cached sampling table is refreshed after 'change_weight'.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        none
+        """
+        die6 = Die(np.array([1, 2, 3]))
+        die6.roll_die(10)
+        die6.change_weight(2, 0)
+        
+        actual = 2 in die6.roll_die(1000)
+        expected = False
+        self.assertEqual(actual, expected)
+    
+    def test_7_roll_die_alias(self):
+        """
+        PURPOSE: Tests the "alias" sampling strategy of 'roll_die' by checking that a zero-weight face is never rolled, both before and after the alias table is rebuilt by 'change_weight', and that the weights steer the rolls.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        none
+        """
+        die7 = Die(np.arange(20))
+        die7.change_weight(0, 0)
+        rolls1 = die7.roll_die(2000, strategy = 'alias')
+        die7.change_weight(0, 1000)
+        die7.change_weight(1, 0)
+        rolls2 = die7.roll_die(2000, strategy = 'alias')
+        
+        actual = 0 not in rolls1 and 1 not in rolls2 and np.mean(rolls2 == 0) > 0.9
+        expected = True
+        self.assertEqual(actual, expected)
+    
+    def test_8_roll_die_seeded(self):
+        """
+        PURPOSE: Tests that dice built from the same seed roll the same faces, that a generator passed to 'roll_die' is used instead of the die's own, and that each of the bit generators can be chosen.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        none
+        """
+        die8 = Die(np.array([1, 2, 3, 4, 5, 6]), rng = 11)
+        die9 = Die(np.array([1, 2, 3, 4, 5, 6]), rng = 11)
+        same_die = list(die8.roll_die(50)) == list(die9.roll_die(50))
+        
+        rolls = []
+        for bit_generator in BIT_GENERATORS:
+            rolls.append(list(die8.roll_die(50, rng = make_rng(4, bit_generator))))
+        same_rng = rolls[0] == list(die9.roll_die(50, rng = make_rng(4)))
+        
+        actual = same_die and same_rng and len(rolls) == len(BIT_GENERATORS)
+        expected = True
+        self.assertEqual(actual, expected)
+    
+    def test_9_change_weights(self):
+        """
+        PURPOSE: Tests the 'change_weights' method of the Die class with both a mapping and an array of new weights, checking the dataframe from 'show_die', the rolls after the change, and that invalid faces or weights raise a ValueError.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        none
+        """
+        die10 = Die(np.array(['a', 'b', 'c', 'd']))
+        die10.roll_die(10)
+        die10.change_weights({'a': 0, 'c': 2.5})
+        weights1 = list(die10.show_die()['weight'])
+        no_a = 'a' not in die10.roll_die(500)
+        die10.change_weights(np.array([0, 0, 0, 1]))
+        only_d = set(die10.roll_die(100)) == {'d'}
+        
+        with self.assertRaises(ValueError):
+            die10.change_weights({'z': 1})
+        with self.assertRaises(ValueError):
+            die10.change_weights([1, -1, 1, 1])
+        
+        actual = weights1 == [0.0, 1.0, 2.5, 1.0] and no_a and only_d
+        expected = True
+        self.assertEqual(actual, expected)
+    
+    def test_10_die_layout(self):
+        """
+        PURPOSE: Tests the array-backed layout of the Die class: dice have no per-instance __dict__, the faces are still available as a list through n, and the weights are a float array.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        none
+        """
+        die11 = Die(np.array([1, 2, 3]))
+        die11.change_weight(2, 4)
+        
+        actual = [hasattr(die11, '__dict__'), die11.n, die11.weights.dtype == np.float64,\
+                  list(die11.weights)]
+        expected = [False, [1, 2, 3], True, [1.0, 4.0, 1.0]]
+        self.assertEqual(actual, expected)
+        
+    def test_11_no_pandas(self):
+        """
+        PURPOSE: Tests that importing the package, rolling dice, playing a game and analyzing its face codes without asking for a dataframe does not import pandas. This runs in a new interpreter, since pandas is already loaded here.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        none
+        """
+        code = ("import sys, numpy as np\n"
+                "from montecarlo.montecarlo import Die, Game, Analyzer, StreamAnalyzer\n"
+                "die = Die(np.arange(6))\n"
+                "die.roll_die(10)\n"
+                "game = Game([die, die])\n"
+                "game.play(100, seed = 0)\n"
+                "Analyzer(game).comp_jackpot_prob()\n"
+                "StreamAnalyzer(game.faces).update(game.codes)\n"
+                "print('pandas' in sys.modules)\n")
+        
+        actual = subprocess.run([sys.executable, '-c', code], capture_output = True, text = True).stdout.strip()
+        expected = 'False'
+        self.assertEqual(actual, expected)
+        
+    def test_12_reweight_large_to_small(self):
+        """
+        PURPOSE: Tests that a die rolled with a huge weight and then set back to small weights rolls every face again, and that a two-faced die set back from 1e17 to 1 can still be rolled.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        none
+        """
+        die12 = Die(np.array([1, 2, 3]), rng = 0)
+        die12.change_weight(3, 1e16)
+        die12.roll_die(1)
+        die12.change_weight(3, 1.0)
+        shares = np.bincount(die12.roll_die(30000), minlength = 4)[1:] / 30000
+        
+        die13 = Die(np.array([1, 2]), rng = 0)
+        die13.change_weight(2, 1e17)
+        die13.roll_die(1)
+        die13.change_weight(2, 1.0)
+        
+        actual = (bool(np.all(np.abs(shares - 1 / 3) < 0.02)), sorted(set(die13.roll_die(100).tolist())))
+        expected = (True, [1, 2])
+        self.assertEqual(actual, expected)
+        
+    def test_13_negative_weight(self):
+        """
+        PURPOSE: Tests that a negative or NaN weight for one face is refused, leaving the die rolling as before.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        none
+        """
+        die14 = Die(np.arange(20), rng = 0)
+        refused = 0
+        for new_weight in (-3, float('nan')):
+            try:
+                die14.change_weight(5, new_weight)
+            except ValueError:
+                refused += 1
+        counts = np.bincount(die14.roll_die(20000), minlength = 20)
+        
+        actual = (refused, die14.weights.tolist(), bool(np.all(np.abs(counts - 1000) < 150)))
+        expected = (2, [1.0] * 20, True)
+        self.assertEqual(actual, expected)
+        
+    def test_14_weights_read_only(self):
+        """
+        PURPOSE: Tests that the weights of a die cannot be written to or replaced directly, so they always agree with the faces the die rolls.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        none
+        """
+        die15 = Die(np.array([1, 2, 3]), rng = 0)
+        die15.roll_die(10)
+        refused = 0
+        try:
+            die15.weights[0] = 0
+        except ValueError:
+            refused += 1
+        try:
+            die15.weights = np.array([0.0, 1.0, 1.0])
+        except AttributeError:
+            refused += 1
+        die15.change_weight(1, 0)
+        
+        actual = (refused, die15.weights.tolist(), 1 in die15.roll_die(1000).tolist())
+        expected = (2, [0.0, 1.0, 1.0], False)
+        self.assertEqual(actual, expected)
         
         
-from montecarlo.montecarlo import Game
+from montecarlo.montecarlo import Game, ExactAnalyzer
 
 class GameTestSuite(unittest.TestCase):
     """
@@ -186,9 +421,204 @@ class GameTestSuite(unittest.TestCase):
         actual = actual_len == expected_len and actual_width == expected_width
         expected = True
         self.assertEqual(actual, expected)
+    
+    def test_4_play_mixed_weights(self):
+        """
+        PURPOSE: Tests the 'play' method of the Game class on dice that do not share weights or face order. Each column of the results must follow its own die, so a face with zero weight on one die may only appear in the other columns.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        none
+        """
+        die1 = Die(np.array(['a', 'b', 'c']))
+        die2 = Die(np.array(['c', 'b', 'a']))
+        die3 = Die(np.array(['a', 'b', 'c']))
+        die2.change_weight('a', 0)
+        die3.change_weight('c', 0)
+        game1 = Game([die1, die2, die3])
+        
+        game1.play(500)
+        game1_df = game1.show_results()
+        
+        actual = 'a' not in set(game1_df[1]) and 'c' not in set(game1_df[2])\
+        and set(game1_df[0]) == {'a', 'b', 'c'}
+        expected = True
+        self.assertEqual(actual, expected)
+    
+    def test_5_show_results_cached(self):
+        """
+        PURPOSE: Tests that 'show_results' returns categorical dataframes over the die faces, reuses the same dataframe until the game is played again, and agrees between the wide and narrow forms.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        none
+        """
+        die1 = Die(np.array(['a', 'b', 'c']))
+        game1 = Game([die1, die1])
+        
+        game1.play(20)
+        wide1 = game1.show_results()
+        narrow1 = game1.show_results('narrow')
+        same = wide1 is game1.show_results()
+        game1.play(30)
+        
+        actual = same and str(wide1.dtypes[0]) == 'category'\
+        and list(narrow1.loc[1, 'face_rolled']) == list(wide1[1])\
+        and len(game1.show_results()) == 30
+        expected = True
+        self.assertEqual(actual, expected)
+    
+    def test_6_play_parallel_seeded(self):
+        """
+        PURPOSE: Tests the 'play' method of the Game class with several workers by checking that two parallel games with the same seed and number of workers give identical results, and that the blocks add up to the requested number of rolls.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        none
+        """
+        die1 = Die(np.array(['a', 'b', 'c']))
+        die2 = Die(np.array(['a', 'b', 'c']))
+        die2.change_weight('a', 4)
+        game1 = Game([die1, die2, die1])
+        
+        game1.play(1001, workers = 3, seed = 42)
+        results1 = game1.show_results().copy()
+        game1.play(1001, workers = 3, seed = 42)
+        results2 = game1.show_results()
+        
+        actual = results1.equals(results2) and len(results2) == 1001
+        expected = True
+        self.assertEqual(actual, expected)
+        
+    def test_7_play_seeded(self):
+        """
+        PURPOSE: Tests that the 'play' method of the Game class gives the same results twice when it is rolled on one worker with the same seed.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        none
+        """
+        die1 = Die(np.array([1, 2, 3, 4, 5, 6]))
+        game1 = Game([die1, die1])
+        
+        game1.play(100, seed = 3)
+        results1 = game1.show_results().copy()
+        game1.play(100, seed = 3)
+        
+        actual = results1.equals(game1.show_results())
+        expected = True
+        self.assertEqual(actual, expected)
+    
+    def test_8_play_until(self):
+        """
+        PURPOSE: Tests the 'play_until' method of the Game class on two fair coins, whose jackpot rate is 0.5. The run must stop once the interval is narrow enough, well before max_rolls, with an interval that holds the true rate. Runs that could never make a batch, or ask for an impossible confidence level, must be refused.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        none
+        """
+        coin = Die(np.array(['H', 'T']))
+        game1 = Game([coin, coin])
+        
+        result = game1.play_until(half_width = 0.02, batch_size = 500, max_rolls = 10 ** 6, seed = 8)
+        
+        actual = result.low <= 0.5 <= result.high and result.high - result.low <= 0.04\
+        and result.num_rolls < 10 ** 6 and result.num_rolls % 500 == 0
+        expected = True
+        self.assertEqual(actual, expected)
+        for bad in ({'max_rolls': 0}, {'batch_size': 0}, {'confidence': 1}, {'confidence': 0}):
+            with self.assertRaises(ValueError):
+                game1.play_until(half_width = 0.1, **bad)
+    
+    def test_9_play_stratified(self):
+        """
+        PURPOSE: Tests the "stratified" and "antithetic" sampling modes of the 'play' method. With stratified sampling each die's share of a face must be within one roll of its weight, and neither mode may roll a face with zero weight.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        none
+        """
+        die1 = Die(np.array(['H', 'T', 'E']))
+        die1.change_weights([1, 3, 0])
+        game1 = Game([die1, die1])
+        
+        game1.play(1000, seed = 2, sampling = 'stratified')
+        heads = (game1.show_results() == 'H').sum()
+        stratified_ok = all(249 <= count <= 251 for count in heads)
+        game1.play(1000, seed = 2, sampling = 'antithetic')
+        
+        actual = stratified_ok and 'E' not in set(game1.show_results()[0])\
+        and game1.roll_weights is None
+        expected = True
+        self.assertEqual(actual, expected)
+        
+    def test_10_play_importance(self):
+        """
+        PURPOSE: Tests the "importance" sampling mode of the 'play' method on a game whose jackpots are too rare to see with plain rolls. The weighted jackpot estimate from the Analyzer must land near the exact probability from the ExactAnalyzer.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        none
+        """
+        dice = []
+        for i in range(8):
+            die = Die(np.array([0, 1, 2, 3]))
+            die.change_weights([100, 1, 1, 1] if i % 2 else [1, 100, 1, 1])
+            dice.append(die)
+        game1 = Game(dice)
+        
+        game1.play(50000, seed = 0, sampling = 'importance')
+        estimate = Analyzer(game1.show_results(), weights = game1.roll_weights).comp_jackpot_prob()
+        exact = ExactAnalyzer(game1).comp_jackpot()
+        
+        actual = abs(estimate / exact - 1) < 0.3
+        expected = True
+        self.assertEqual(actual, expected)
+    
+    def test_11_save_load(self):
+        """
+        PURPOSE: Tests the 'save' and 'load' methods of the Game class by saving a played game to a temporary directory and loading it back. The loaded game must show the same results from a memory-mapped matrix of face codes and rebuild the dice with their weights.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        none
+        """
+        die1 = Die(np.array(['a', 'b', 'c']))
+        die2 = Die(np.array(['c', 'b', 'a']))
+        die2.change_weight('b', 4)
+        game1 = Game([die1, die2])
+        game1.play(300, seed = 1, sampling = 'importance')
+        
+        with tempfile.TemporaryDirectory() as path:
+            game1.save(path)
+            game2 = Game.load(path)
+            
+            actual = isinstance(game2.codes, np.memmap)\
+            and game2.show_results().equals(game1.show_results())\
+            and list(game2.die_lst[1].weights) == [1.0, 4.0, 1.0]\
+            and list(game2.roll_weights) == list(game1.roll_weights)
+            del game2
+        expected = True
+        self.assertEqual(actual, expected)
         
         
-from montecarlo.montecarlo import Analyzer
+from montecarlo.montecarlo import Analyzer, analyzer_for
 
 class AnalyzerTestSuite(unittest.TestCase):
     """
@@ -357,6 +787,604 @@ class AnalyzerTestSuite(unittest.TestCase):
         expected = 10
         self.assertEqual(actual, expected)
             
+    def test_7_comp_jackpot_values(self):
+        """
+        PURPOSE: Tests the 'comp_jackpot' method of the Analyzer class on a game whose jackpots are known, checking that the wide and narrow forms count the same jackpots and keep the right rows in jackpot_df.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        none
+        """
+        die1 = Die(np.array([1, 2, 3]))
+        die1.change_weight(2, 0)
+        die1.change_weight(3, 0)
+        die2 = Die(np.array([1, 2, 3]))
+        game = Game([die1, die1, die2])
+        game.play(200)
+        
+        analyze_wide = Analyzer(game.show_results('wide'))
+        analyze_nar = Analyzer(game.show_results('narrow'))
+        expected_rolls = list(np.flatnonzero(game.show_results()[2] == 1))
+        
+        actual = analyze_wide.comp_jackpot() == analyze_nar.comp_jackpot() == len(expected_rolls)\
+        and list(analyze_wide.jackpot_df.index) == expected_rolls\
+        and list(analyze_nar.jackpot_df.index) == expected_rolls
+        expected = True
+        self.assertEqual(actual, expected)
+            
+    def test_8_comp_combo_values(self):
+        """
+        PURPOSE: Tests that the 'comp_combo' method of the Analyzer class gives the same combo_df as sorting each roll and counting the sorted rows with pandas.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        none
+        """
+        game_results = pd.DataFrame([[1, 3, 1], [3, 1, 1], [2, 2, 2], [1, 1, 3]])
+        analyze_wide = Analyzer(game_results)
+        analyze_wide.comp_combo()
+        
+        expected_df = game_results.apply(lambda x: pd.Series(sorted(x)), 1)\
+        .value_counts().to_frame('n')
+        
+        actual = analyze_wide.combo_df.equals(expected_df)\
+        and list(analyze_wide.combo_df.index) == list(expected_df.index)
+        expected = True
+        self.assertEqual(actual, expected)
+        
+    def test_9_count_faces_per_roll_values(self):
+        """
+        PURPOSE: Tests that the 'count_faces_per_roll' method of the Analyzer class gives the same val_counts_df as counting the faces of each roll with pandas.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        none
+        """
+        game_results = pd.DataFrame([['b', 'a', 'a'], ['c', 'c', 'c'], ['a', 'c', 'b']])
+        analyze_wide = Analyzer(game_results)
+        analyze_wide.count_faces_per_roll()
+        
+        expected_df = game_results.apply(pd.Series.value_counts, axis = 1).fillna(0)
+        
+        actual = analyze_wide.val_counts_df.equals(expected_df)
+        expected = True
+        self.assertEqual(actual, expected)
+        
+    def test_10_comp_permutation(self):
+        """
+        PURPOSE: Tests the 'comp_permutation' method of the Analyzer class by checking that rolls with the same faces in a different order are counted as different permutations, and that perm_df has the same shape as combo_df.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        none
+        """
+        game_results = pd.DataFrame([[1, 3, 1], [3, 1, 1], [1, 3, 1], [2, 2, 2]])
+        analyze_wide = Analyzer(game_results)
+        analyze_wide.comp_permutation()
+        analyze_wide.comp_combo()
+        
+        actual = list(analyze_wide.perm_df['n']) == [2, 1, 1]\
+        and analyze_wide.perm_df.loc[(1, 3, 1), 'n'] == 2\
+        and list(analyze_wide.perm_df.columns) == list(analyze_wide.combo_df.columns)\
+        and analyze_wide.perm_df.index.names == analyze_wide.combo_df.index.names
+        expected = True
+        self.assertEqual(actual, expected)
+        
+    def test_11_comp_permutation_wide_keys(self):
+        """
+        PURPOSE: Tests the 'comp_permutation' method of the Analyzer class on a game whose permutations do not fit in a 64-bit key (300 faces and 9 dice), which falls back to byte keys.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        none
+        """
+        rolls = np.random.default_rng(5).integers(0, 300, (100, 9))
+        rolls[:4] = rolls[0]
+        analyze_wide = Analyzer(pd.DataFrame(rolls))
+        analyze_wide.comp_permutation()
+        
+        actual = analyze_wide.perm_df['n'].iloc[0] == 4\
+        and list(analyze_wide.perm_df.index[0]) == list(rolls[0])\
+        and analyze_wide.perm_df['n'].sum() == 100
+        expected = True
+        self.assertEqual(actual, expected)
+        
+    def test_12_analyzer_inputs(self):
+        """
+        PURPOSE: Tests that an Analyzer made from a Game or from a matrix of face codes gives the same jackpots, combos and permutations as one made from the game's results dataframe.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        none
+        """
+        die1 = Die(np.array(['b', 'a', 'c']))
+        game = Game([die1, die1, die1])
+        game.play(500, seed = 3)
+        
+        analyzers = [Analyzer(game.show_results()), Analyzer(game),\
+                     Analyzer(game.codes, faces = game.faces)]
+        for analyzer in analyzers:
+            analyzer.comp_combo()
+            analyzer.comp_permutation()
+        
+        actual = [(a.comp_jackpot(), a.combo_df.equals(analyzers[0].combo_df),\
+                   a.perm_df.equals(analyzers[0].perm_df)) for a in analyzers]
+        expected = [(analyzers[0].comp_jackpot(), True, True)] * 3
+        self.assertEqual(actual, expected)
+        
+    def test_13_memoized_stats(self):
+        """
+        PURPOSE: Tests that the Analyzer hands back the same combo_df when asked again, and that an Analyzer made from a Game computes new statistics once the game is played again.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        none
+        """
+        die1 = Die(np.array([1, 2, 3]))
+        game = Game([die1, die1])
+        game.play(200, seed = 1)
+        analyzer = Analyzer(game)
+        analyzer.comp_combo()
+        first_df = analyzer.combo_df
+        analyzer.comp_combo()
+        repeated = analyzer.combo_df is first_df
+        
+        game.play(300, seed = 2)
+        analyzer.comp_combo()
+        
+        actual = (repeated, game.generation, int(analyzer.combo_df['n'].sum()))
+        expected = (True, 2, 300)
+        self.assertEqual(actual, expected)
+        
+    def test_14_analyzer_for(self):
+        """
+        PURPOSE: Tests that analyzer_for gives the same Analyzer for the same game and a different one for another game.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        none
+        """
+        die1 = Die(np.array([1, 2, 3]))
+        game1 = Game([die1, die1])
+        game2 = Game([die1, die1])
+        game1.play(10, seed = 1)
+        game2.play(10, seed = 1)
+        
+        actual = (analyzer_for(game1) is analyzer_for(game1), analyzer_for(game1) is analyzer_for(game2))
+        expected = (True, False)
+        self.assertEqual(actual, expected)
+        
+    def test_15_histogram_results(self):
+        """
+        PURPOSE: Tests that a game played with results="histogram" gives the same jackpots and combos as the same game keeping its rolls, that its per-die totals match the rolls, and that permutations are refused.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        none
+        """
+        die1 = Die(np.array(['c', 'b', 'a']))
+        die1.change_weight('a', 3)
+        game = Game([die1, die1, die1, die1])
+        game.play(500, seed = 8)
+        full = Analyzer(game)
+        full.comp_combo()
+        totals = np.array([np.bincount(game.codes[:, j], minlength = 3) for j in range(4)])
+        
+        game.play(500, seed = 8, results = 'histogram')
+        sparse = Analyzer(game)
+        sparse.comp_combo()
+        
+        actual = (sparse.comp_jackpot(), sparse.combo_df.equals(full.combo_df),\
+                  game.histogram.die_totals.tolist(), game.codes)
+        expected = (full.comp_jackpot(), True, totals.tolist(), None)
+        self.assertEqual(actual, expected)
+        with self.assertRaises(ValueError):
+            sparse.comp_permutation()
+            
+    def test_16_unsorted_faces_in_place(self):
+        """
+        PURPOSE: Tests that a loaded (memory-mapped) game whose faces are not in sorted order is analyzed without copying its codes and gives the same statistics as its dataframe.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        none
+        """
+        die1 = Die(np.array(['c', 'b', 'a']))
+        die1.change_weight('a', 3)
+        game = Game([die1, die1, die1, die1])
+        game.play(500, seed = 9)
+        frame = Analyzer(game.show_results())
+        num_jackpots = frame.comp_jackpot()
+        frame.comp_combo()
+        frame.comp_permutation()
+        frame.count_faces_per_roll()
+        with tempfile.TemporaryDirectory() as path:
+            game.save(path)
+            loaded = Game.load(path)
+            mapped = Analyzer(loaded)
+            mapped.comp_combo()
+            mapped.comp_permutation()
+            mapped.count_faces_per_roll()
+            
+            actual = (mapped.comp_jackpot(), mapped.jackpot_df.equals(frame.jackpot_df.astype(str)),\
+                      mapped.combo_df.equals(frame.combo_df), mapped.perm_df.equals(frame.perm_df),\
+                      mapped.val_counts_df.equals(frame.val_counts_df),\
+                      np.shares_memory(mapped._Analyzer__codes, loaded.codes))
+            del mapped, loaded
+        expected = (num_jackpots, True, True, True, True, True)
+        self.assertEqual(actual, expected)
+            
+    def test_17_one_die_wide(self):
+        """
+        PURPOSE: Tests that the wide results of a one-die game are analyzed as wide, giving the same statistics as its narrow results and as the game itself.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        none
+        """
+        die1 = Die(np.array(['c', 'b', 'a']))
+        game = Game([die1])
+        game.play(200, seed = 4)
+        results = []
+        for game_results in (game.show_results(), game.show_results('narrow'), game):
+            analyzer = Analyzer(game_results)
+            analyzer.comp_combo()
+            results.append((analyzer.comp_jackpot(), analyzer.combo_df['n'].tolist()))
+        
+        actual = results
+        expected = [(200, results[2][1])] * 3
+        self.assertEqual(actual, expected)
+            
+    
+from montecarlo.montecarlo import StreamAnalyzer
+
+class StreamAnalyzerTestSuite(unittest.TestCase):
+    """
+    PURPOSE: This class will test the Game.play_chunks method and the StreamAnalyzer class using unittest.
+    
+        INPUT:
+        none
+        
+        OUTPUT:
+        none
+    """
+    def test_1_play_chunks(self):
+        """
+        PURPOSE: Tests the 'play_chunks' method of the Game class by checking that the chunks have the requested size and add up to the requested number of rolls.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        none
+        """
+        die1 = Die(np.array([1, 2, 3]))
+        game = Game([die1, die1])
+        
+        chunks = list(game.play_chunks(1000, chunk_size = 300))
+        
+        actual = [chunk.shape for chunk in chunks]
+        expected = [(300, 2), (300, 2), (300, 2), (100, 2)]
+        self.assertEqual(actual, expected)
+        
+    def test_2_update_merge(self):
+        """
+        PURPOSE: Tests the 'update' and 'merge' methods of the StreamAnalyzer class by splitting a game's chunks between two stream analyzers, merging them, and checking the jackpots, combos and face totals against an Analyzer over the whole game.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        none
+        """
+        die1 = Die(np.array(['c', 'b', 'a']))
+        game = Game([die1, die1, die1])
+        chunks = list(game.play_chunks(1000, chunk_size = 300))
+        
+        stream1 = StreamAnalyzer(game.faces)
+        stream2 = StreamAnalyzer(game.faces)
+        for chunk in chunks[:2]:
+            stream1.update(chunk)
+        for chunk in chunks[2:]:
+            stream2.update(chunk)
+        stream1.merge(stream2)
+        stream1.comp_combo()
+        stream1.count_faces()
+        
+        analyze_wide = Analyzer(pd.DataFrame(game.faces[np.vstack(chunks)]))
+        analyze_wide.comp_combo()
+        
+        actual = stream1.comp_jackpot() == analyze_wide.comp_jackpot()\
+        and stream1.combo_df.equals(analyze_wide.combo_df)\
+        and stream1.face_counts_df['n'].sum() == 3000 and stream1.num_rolls == 1000
+        expected = True
+        self.assertEqual(actual, expected)
+        
+    def test_3_async(self):
+        """
+        PURPOSE: Tests the 'play_async' and 'analyze_async' methods of the Game class by checking that analyze_async reports progress after every chunk and ends with the jackpots and combos of play_async with the same seed and chunk size.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        none
+        """
+        die1 = Die(np.array(['c', 'b', 'a']))
+        game = Game([die1, die1, die1])
+        
+        async def run():
+            await game.play_async(1000, chunk_size = 300, seed = 9)
+            progress = []
+            async for stream in game.analyze_async(1000, chunk_size = 300, seed = 9):
+                progress.append(stream.num_rolls)
+            return progress, stream
+        progress, stream = asyncio.run(run())
+        stream.comp_combo()
+        analyzer = Analyzer(game)
+        analyzer.comp_combo()
+        
+        actual = (progress, stream.comp_jackpot(), stream.combo_df.equals(analyzer.combo_df))
+        expected = ([300, 600, 900, 1000], analyzer.comp_jackpot(), True)
+        self.assertEqual(actual, expected)
+        
+        
+from montecarlo.montecarlo import ExactAnalyzer
+
+class ExactAnalyzerTestSuite(unittest.TestCase):
+    """
+    PURPOSE: This class will test the ExactAnalyzer class using unittest.
+    
+        INPUT:
+        none
+        
+        OUTPUT:
+        none
+    """
+    def test_1_exact_values(self):
+        """
+        PURPOSE: Tests the 'comp_jackpot', 'comp_combo' and 'count_faces_per_roll' methods of the ExactAnalyzer class on two coins, one fair and one weighted 3 to 1, whose probabilities can be worked out by hand.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        none
+        """
+        die1 = Die(np.array(['H', 'T']))
+        die2 = Die(np.array(['T', 'H']))
+        die2.change_weight('H', 3)
+        exact = ExactAnalyzer(Game([die1, die2]))
+        exact.comp_combo()
+        exact.count_faces_per_roll()
+        
+        actual = [round(exact.comp_jackpot(), 6),\
+                  round(exact.combo_df.loc[('H', 'T'), 'p'], 6),\
+                  round(exact.combo_df.loc[('H', 'H'), 'p'], 6),\
+                  round(exact.val_counts_df.loc['expected', 'H'], 6)]
+        expected = [0.5, 0.5, 0.375, 1.25]
+        self.assertEqual(actual, expected)
+        
+    def test_2_exact_too_large(self):
+        """
+        PURPOSE: Tests that the 'comp_combo' method of the ExactAnalyzer class refuses games with more combinations than max_states.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        none
+        """
+        die1 = Die(np.arange(10))
+        exact = ExactAnalyzer(Game([die1] * 10), max_states = 1000)
+        
+        with self.assertRaises(ValueError):
+            exact.comp_combo()
+        
+        
+from montecarlo.montecarlo import Profiler
+
+class ProfilerTestSuite(unittest.TestCase):
+    """
+    PURPOSE: This class will test the Profiler class using unittest.
+    
+        INPUT:
+        none
+        
+        OUTPUT:
+        none
+    """
+    def test_1_phases(self):
+        """
+        PURPOSE: Tests that a Profiler records the sample, assemble, reshape and analyze phases of playing and analyzing a game, counts the rolls of each phase, calls its callback, and stops recording after the with block.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        none
+        """
+        die1 = Die(np.array([1, 2, 3]))
+        game = Game([die1, die1])
+        calls = []
+        
+        with Profiler(callback = lambda *args: calls.append(args[0])) as profiler:
+            game.play(100, seed = 0)
+            game.show_results()
+            Analyzer(game).comp_jackpot()
+        game.play(100, seed = 0)
+        stats = profiler.stats
+        
+        actual = (sorted(stats), stats['sample'].rolls, stats['sample'].calls, sorted(set(calls)))
+        expected = (['analyze', 'assemble', 'reshape', 'sample'], 200, 1,\
+                    ['analyze', 'assemble', 'reshape', 'sample'])
+        self.assertEqual(actual, expected)
+            
+    def test_2_threads(self):
+        """
+        PURPOSE: Tests that the phases of games played on several threads at once are all recorded.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        none
+        """
+        die1 = Die(np.array([1, 2, 3, 4, 5, 6]))
+        def play():
+            game = Game([die1, die1, die1])
+            for i in range(20):
+                game.play(1000)
+        with Profiler() as profiler:
+            threads = [threading.Thread(target = play) for i in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        
+        actual = (profiler.stats['sample'].calls, profiler.stats['sample'].rolls)
+        expected = (80, 80 * 3000)
+        self.assertEqual(actual, expected)
+    
+    
+from montecarlo.montecarlo import sweep
+
+class SweepTestSuite(unittest.TestCase):
+    """
+    PURPOSE: This class will test the sweep function using unittest.
+    
+        INPUT:
+        none
+        
+        OUTPUT:
+        none
+    """
+    def test_1_sweep(self):
+        """
+        PURPOSE: Tests that sweep gives one row per weight configuration, number of dice and number of rolls in grid order, that the same seed gives the same table with one or two workers, and that a one-die game never misses a jackpot.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        none
+        """
+        weights = {'fair': [1, 1, 1], 'loaded': [1, 1, 5]}
+        table1 = sweep(np.array(['a', 'b', 'c']), weights, [1, 3], [50, 200], seed = 5)
+        table2 = sweep(np.array(['a', 'b', 'c']), weights, [1, 3], [50, 200], seed = 5, workers = 2)
+        
+        actual = (list(table1['config']), list(table1['num_dice']), list(table1['num_rolls']),\
+                  table1.equals(table2), list(table1['jackpots'][table1['num_dice'] == 1]))
+        expected = (['fair'] * 4 + ['loaded'] * 4, [1, 1, 3, 3] * 2, [50, 200] * 4, True, [50, 200] * 2)
+        self.assertEqual(actual, expected)
+    
+    
+from montecarlo.cli import main, run
+
+class CliTestSuite(unittest.TestCase):
+    """
+    PURPOSE: This class will test the command-line driver using unittest.
+    
+        INPUT:
+        none
+        
+        OUTPUT:
+        none
+    """
+    def test_1_main(self):
+        """
+        PURPOSE: Tests that the command-line driver runs a spec, writes statistics that agree with an Analyzer over the saved binary results, and reports its throughput.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        none
+        """
+        with tempfile.TemporaryDirectory() as path:
+            spec_path = os.path.join(path, 'spec.json')
+            with open(spec_path, 'w') as f:
+                json.dump({'faces': ['a', 'b', 'c'], 'weights': [1, 1, 4], 'num_dice': 3,\
+                           'num_rolls': 2000, 'seed': 3, 'chunk_size': 700}, f)
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                status = main([spec_path, '-o', os.path.join(path, 'stats.json'),\
+                               '--save', os.path.join(path, 'run')])
+            with open(os.path.join(path, 'stats.json')) as f:
+                stats = json.load(f)
+            analyzer = Analyzer(Game.load(os.path.join(path, 'run')))
+            
+            actual = (status, stats['num_rolls'], stats['jackpots'], 'rolls/s' in out.getvalue())
+            expected = (0, 2000, analyzer.comp_jackpot(), True)
+            self.assertEqual(actual, expected)
+            
+    def test_2_chunks_on_workers(self):
+        """
+        PURPOSE: Tests that a chunked run without saving spreads its chunks over the workers, giving the same statistics as one worker, and that the time of a save is reported on its own.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        none
+        """
+        spec = {'faces': ['a', 'b', 'c'], 'weights': [1, 1, 4], 'num_dice': 3, 'num_rolls': 2000,\
+                'seed': 3, 'workers': 1, 'chunk_size': 300, 'bit_generator': 'PCG64'}
+        single = run(spec)
+        parallel = run(dict(spec, workers = 2))
+        with tempfile.TemporaryDirectory() as path:
+            saved = run(spec, save = os.path.join(path, 'run'))
+        
+        actual = (parallel['jackpots'], parallel['top_combos'], parallel['face_totals'],\
+                  single['save_seconds'], saved['save_seconds'] >= 0)
+        expected = (single['jackpots'], single['top_combos'], single['face_totals'], None, True)
+        self.assertEqual(actual, expected)
+            
+    def test_3_bad_weights(self):
+        """
+        PURPOSE: Tests that a spec with empty or ragged weights is refused with an error message instead of a traceback.
+        
+        INPUT:
+        none
+        
+        OUTPUT:
+        none
+        """
+        with tempfile.TemporaryDirectory() as path:
+            actual = []
+            for weights in ([], [[1, 1, 1], [1, 1]], [1, 2]):
+                spec_path = os.path.join(path, 'spec.json')
+                with open(spec_path, 'w') as f:
+                    json.dump({'faces': ['a', 'b', 'c'], 'weights': weights, 'num_rolls': 10}, f)
+                err = io.StringIO()
+                with contextlib.redirect_stderr(err), self.assertRaises(SystemExit) as exit:
+                    main([spec_path])
+                actual.append((exit.exception.code, 'weights' in err.getvalue()))
+        expected = [(2, True)] * 3
+        self.assertEqual(actual, expected)
+    
     
 if __name__ == '__main__':
     unittest.main(verbosity=2)
\ No newline at end of file
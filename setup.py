@@ -8,5 +8,8 @@ setup(
     author_email = 'ufu2rg@virginia.edu',
     license = 'MIT',
     description = 'This package details a booklovers journey through books.',
-    packages = ['montecarlo']
+    packages = ['montecarlo'],
+    entry_points = {
+        'console_scripts': ['montecarlo = montecarlo.cli:main']
+    }
 )
\ No newline at end of file